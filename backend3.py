@@ -1,31 +1,71 @@
-from flask import Flask, jsonify, render_template_string, request, redirect, url_for
+from flask import Flask, Response, jsonify, request, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 import os
 import json
-from datetime import datetime, timedelta
+import functools
+import logging
 import traceback
+import threading
+import queue
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import sqlite3
+import numexpr as ne
+import orjson
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 from werkzeug.utils import secure_filename
 import zipfile
+import gzip
+import brotli
+import hashlib
 import tempfile
 import shutil
-import os
 
 # Optional geopandas import for shapefile support
 try:
     import geopandas as gpd
+    from shapely.geometry import Point
     GEOPANDAS_AVAILABLE = True
     print("✅ GeoPandas available - shapefile upload enabled")
 except ImportError:
     GEOPANDAS_AVAILABLE = False
     print("⚠️  GeoPandas not available - shapefile upload disabled")
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson instead of the stdlib json module"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_SERIALIZE_NUMPY)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
+# Per-request diagnostics; debug messages are dropped unless logging is configured for them
+log = logging.getLogger(__name__)
+
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+
+# Compress API responses on the fly; the page and zone GeoJSON are served precompressed
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html', 'text/javascript', 'application/javascript', 'text/css']
+Compress(app)
+
+# Suffix of the precompressed copy for each encoding, in order of preference
+PRECOMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
 UPLOAD_FOLDER = 'uploads'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
@@ -40,6 +80,252 @@ TAXI_ZONES_PATH = "/Users/sudhirerahul/Desktop/Python/taxi_zones"
 # Global database connection
 db_path = os.environ.get("DB_PATH", "/data/taxi_data.db")
 zones_geojson_path = "taxi_zones.geojson"
+default_zones_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_zones.json")
+
+# Douglas-Peucker tolerance in degrees applied to uploaded zone polygons (~10m in NYC)
+ZONE_SIMPLIFY_TOLERANCE = 1e-4
+
+# Bump whenever the fhvhv schema changes so existing databases get rebuilt
+SCHEMA_VERSION = 7
+
+# Default cap on parallel ingest workers (override with INGEST_WORKERS); peak memory grows with each one
+MAX_DEFAULT_INGEST_WORKERS = 3
+
+# Raw parquet columns needed to build the fhvhv table
+PARQUET_COLUMNS = [
+    'PULocationID', 'DOLocationID', 'pickup_datetime', 'dropoff_datetime',
+    'trip_miles', 'trip_time', 'base_passenger_fare', 'tolls', 'bcf', 'sales_tax',
+    'congestion_surcharge', 'airport_fee', 'on_scene_datetime', 'request_datetime'
+]
+
+# Columns of the fhvhv table, in insert order
+FHVHV_COLUMNS = [
+    'PULocationID', 'DOLocationID', 'pickup_datetime',
+    'pickup_hour', 'day_of_week', 'pickup_month', 'day_type',
+    'trip_miles', 'duration_minutes', 'price_per_mile', 'total_fare_amount', 'wait_time_minutes'
+]
+INSERT_FHVHV_SQL = f"INSERT INTO fhvhv ({', '.join(FHVHV_COLUMNS)}) VALUES ({', '.join('?' * len(FHVHV_COLUMNS))})"
+
+# Per-route summary tables and the time bucket each one is grouped by
+ROUTE_STATS_TABLES = {
+    'route_hour_stats': 'pickup_hour',
+    'route_day_stats': 'day_of_week',
+    'route_month_stats': 'pickup_month',
+}
+
+# Per-bucket route totals behind the high impact endpoints and the time buckets each one is keyed by
+HIGH_IMPACT_TABLES = {
+    'route_dayhour_totals': ('day_of_week', 'pickup_hour'),
+    'route_month_totals': ('pickup_month',),
+}
+
+# Labels for day_of_week (0 = Monday), pickup_hour and pickup_month (1 = January)
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+HOUR_LABELS = tuple(f"{hour}:00" for hour in range(24))
+MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+FULL_MONTH_NAMES = (
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+)
+MONTH_LABELS = tuple(f"{name} 2024" for name in FULL_MONTH_NAMES)
+
+# Valid high impact query arguments; None or out of range values simply miss the lookup
+VALID_DAYS = range(len(DAY_NAMES))
+VALID_HOURS = range(len(HOUR_LABELS))
+VALID_MONTHS = range(1, len(MONTH_LABELS) + 1)
+
+# Response keys for the metric columns of each route analysis row, in query order
+ROUTE_METRIC_KEYS = ('volume', 'price_per_mile', 'total_fare_amount', 'avg_duration', 'avg_wait_time')
+
+# Fare components summed into total_fare_amount
+FARE_COLUMNS = ['base_passenger_fare', 'tolls', 'bcf', 'sales_tax', 'congestion_surcharge', 'airport_fee']
+
+# Basic data cleaning, the 2024 filter and the fare-independent outlier bounds,
+# evaluated inside Arrow while streaming so dropped rows never reach pandas
+PARQUET_FILTER = (
+    (pc.year(pc.field('pickup_datetime')) == 2024) &
+    pc.field('dropoff_datetime').is_valid() &
+    pc.field('PULocationID').is_valid() &
+    pc.field('DOLocationID').is_valid() &
+    (pc.field('trip_miles') > 0) &
+    (pc.field('trip_miles') < 100) &  # Remove extreme distances
+    (pc.field('trip_time') > 60) &  # duration_minutes > 1
+    (pc.field('trip_time') < 18000)  # duration_minutes < 300
+)
+
+def column_array(batch, name, dtype):
+    """Get a batch column as a numpy array of the given dtype"""
+    return batch.column(name).to_numpy(zero_copy_only=False).astype(dtype, copy=False)
+
+def prepare_trips(batch):
+    """Derive the fhvhv columns from a batch of raw trips and drop outliers"""
+    pickup = column_array(batch, 'pickup_datetime', 'datetime64[ns]')
+    trip_miles = column_array(batch, 'trip_miles', 'float64')
+    trip_time = column_array(batch, 'trip_time', 'int64')
+    
+    # Calculate total fare amount and price per mile in one fused numexpr pass, treating missing fares as 0
+    fares = {c: pc.fill_null(batch.column(c), 0.0).to_numpy(zero_copy_only=False).astype('float64', copy=False)
+             for c in FARE_COLUMNS}
+    total_fare_amount = ne.evaluate(' + '.join(FARE_COLUMNS), local_dict=fares)
+    price_per_mile = ne.evaluate('total_fare_amount / trip_miles')
+    
+    # Filter out extreme fare outliers; distance and duration bounds are already applied in PARQUET_FILTER
+    keep = ne.evaluate(
+        '(price_per_mile > 0) & (price_per_mile < 50) & '  # Remove extreme prices
+        '(total_fare_amount > 0) & (total_fare_amount < 500)'  # Remove extreme total fares
+    )
+    pickup = pickup[keep]
+    
+    # Calendar fields from the raw timestamps (1970-01-01 was a Thursday, day 3 with Monday = 0)
+    pickup_ns = pickup.view('int64')
+    day_of_week = ((pickup_ns // 86_400_000_000_000 + 3) % 7).astype('uint8')
+    
+    # Calculate wait time in minutes straight on the datetime64 arrays; missing times count as 0
+    if 'on_scene_datetime' in batch.schema.names and 'request_datetime' in batch.schema.names:
+        wait_ns = (column_array(batch, 'on_scene_datetime', 'datetime64[ns]')[keep] -
+                   column_array(batch, 'request_datetime', 'datetime64[ns]')[keep])
+        wait_time = wait_ns / np.timedelta64(1, 'm')
+        wait_time_minutes = np.clip(np.nan_to_num(wait_time, nan=0.0), 0, 60)  # Cap at 60 minutes
+    else:
+        wait_time_minutes = np.zeros(len(pickup))
+    
+    # Store pickup time as unix seconds and shrink the integer columns
+    return pa.RecordBatch.from_arrays([
+        column_array(batch, 'PULocationID', 'uint16')[keep],
+        column_array(batch, 'DOLocationID', 'uint16')[keep],
+        pickup.astype('datetime64[s]').view('int64'),
+        (pickup_ns // 3_600_000_000_000 % 24).astype('uint8'),
+        day_of_week,
+        (pickup.astype('datetime64[M]').view('int64') % 12 + 1).astype('uint8'),
+        (day_of_week >= 5).astype('int8'),  # day type (1 = weekend, 0 = weekday)
+        trip_miles[keep],
+        trip_time[keep] / 60.0,
+        price_per_mile[keep],
+        total_fare_amount[keep],
+        wait_time_minutes,
+    ], names=FHVHV_COLUMNS)
+
+def trip_count(conn):
+    """Rows in fhvhv as recorded by ANALYZE at build time; COUNT(*) would scan the whole table"""
+    # The first figure of a table's sqlite_stat1 entry is its row count; an empty table has no entry
+    row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = 'fhvhv' LIMIT 1").fetchone()
+    return int(row[0].split()[0]) if row else 0
+
+def remove_database():
+    """Delete the SQLite database along with any leftover WAL files"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+def process_file(file_path, spill_dir):
+    """Stream one parquet file and spill its cleaned trips to an Arrow file (runs in a worker process)"""
+    # Stream only the columns we use, letting Arrow drop invalid and non-2024 rows
+    dataset = ds.dataset(file_path, format='parquet')
+    columns = [c for c in PARQUET_COLUMNS if c in dataset.schema.names]
+    
+    # Write each cleaned batch out as soon as it is ready so only one batch is held in memory
+    spill_path = os.path.join(spill_dir, os.path.basename(file_path) + '.arrow')
+    writer = None
+    rows = 0
+    try:
+        for batch in dataset.to_batches(columns=columns, filter=PARQUET_FILTER, batch_size=500_000):
+            if batch.num_rows == 0:
+                continue
+            clean = prepare_trips(batch)
+            if writer is None:
+                writer = pa.ipc.new_file(spill_path, clean.schema)
+            writer.write_batch(clean)
+            rows += clean.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return (spill_path if writer is not None else None), rows
+
+def insert_spilled_trips(conn, spill_path):
+    """Insert a worker's spilled trips batch by batch in a single transaction"""
+    with pa.memory_map(spill_path) as source, conn:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            df_batch = reader.get_batch(i).to_pandas()
+            conn.executemany(INSERT_FHVHV_SQL, df_batch.to_records(index=False).tolist())
+
+def build_route_stats(conn):
+    """Precompute per-route aggregates so analyze_route never scans fhvhv"""
+    for table, bucket in ROUTE_STATS_TABLES.items():
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        # Clustered on the lookup key, so each route is one contiguous covering range
+        conn.execute(f"""
+            CREATE TABLE {table} (
+                PULocationID INTEGER,
+                DOLocationID INTEGER,
+                day_type INTEGER,
+                {bucket} INTEGER,
+                trips INTEGER,
+                sum_price_per_mile REAL,
+                sum_total_fare REAL,
+                sum_duration REAL,
+                sum_wait_time REAL,
+                PRIMARY KEY (PULocationID, DOLocationID, day_type, {bucket})
+            ) WITHOUT ROWID
+        """)
+        conn.execute(f"""
+            INSERT INTO {table}
+            SELECT 
+                PULocationID,
+                DOLocationID,
+                day_type,
+                {bucket},
+                COUNT(*) as trips,
+                SUM(price_per_mile) as sum_price_per_mile,
+                SUM(total_fare_amount) as sum_total_fare,
+                SUM(duration_minutes) as sum_duration,
+                SUM(wait_time_minutes) as sum_wait_time
+            FROM fhvhv
+            WHERE PULocationID != 265
+              AND DOLocationID != 265
+              AND price_per_mile > 0
+              AND total_fare_amount > 0
+              AND duration_minutes > 0
+              AND wait_time_minutes >= 0
+            GROUP BY PULocationID, DOLocationID, day_type, {bucket}
+        """)
+
+def build_high_impact_stats(conn):
+    """Precompute per-bucket route totals so the high impact endpoints never scan fhvhv"""
+    for table, buckets in HIGH_IMPACT_TABLES.items():
+        bucket_cols = ', '.join(buckets)
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        # Clustered on the time bucket, so each request reads one contiguous range
+        conn.execute(f"""
+            CREATE TABLE {table} (
+                {' INTEGER, '.join(buckets)} INTEGER,
+                PULocationID INTEGER,
+                DOLocationID INTEGER,
+                trips INTEGER NOT NULL,
+                sum_total_fare REAL NOT NULL,
+                sum_duration REAL NOT NULL,
+                sum_distance REAL NOT NULL,
+                PRIMARY KEY ({bucket_cols}, PULocationID, DOLocationID)
+            ) WITHOUT ROWID
+        """)
+        # TOTAL() sums to 0.0 rather than NULL, so the averages served from here are never NULL
+        conn.execute(f"""
+            INSERT INTO {table}
+            SELECT 
+                {bucket_cols},
+                PULocationID,
+                DOLocationID,
+                COUNT(*) as trips,
+                TOTAL(total_fare_amount) as sum_total_fare,
+                TOTAL(duration_minutes) as sum_duration,
+                TOTAL(trip_miles) as sum_distance
+            FROM fhvhv
+            WHERE PULocationID != 265
+              AND DOLocationID != 265
+              AND total_fare_amount > 0
+              AND duration_minutes > 0
+            GROUP BY {bucket_cols}, PULocationID, DOLocationID
+        """)
 
 def init_database():
     """Initialize SQLite database and load the actual data using pandas"""
@@ -47,27 +333,33 @@ def init_database():
         # Check if database already exists with data
         if os.path.exists(db_path):
             try:
-                conn = get_db_connection()
+                conn = sqlite3.connect(db_path)
                 cursor = conn.cursor()
-                # Check if we have the total_fare_amount column
-                cursor.execute("PRAGMA table_info(fhvhv)")
-                columns = [row[1] for row in cursor.fetchall()]
-                if 'total_fare_amount' in columns:
-                    cursor.execute("SELECT COUNT(*) FROM fhvhv")
-                    count = cursor.fetchone()[0]
+                # Check the database was built with the current schema
+                cursor.execute("PRAGMA user_version")
+                if cursor.fetchone()[0] == SCHEMA_VERSION:
+                    count = trip_count(conn)
+                    # The summary tables are built last, so they are only all there if the load finished
+                    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+                    tables = {row[0] for row in cursor.fetchall()}
+                    complete = tables.issuperset(ROUTE_STATS_TABLES) and tables.issuperset(HIGH_IMPACT_TABLES)
+                    # Fold any leftover WAL into the main file before serving it as immutable
+                    cursor.execute("PRAGMA journal_mode = DELETE")
                     conn.close()
                     
-                    if count > 0:
-                        print(f"Database already exists with {count:,} records and total_fare_amount column!")
+                    if count > 0 and complete:
+                        print(f"Database already exists with {count:,} records and schema version {SCHEMA_VERSION}!")
                         print("Skipping data loading, using existing database...")
                         return True
+                    print("Database exists but its last load did not finish, recreating...")
+                    remove_database()
                 else:
-                    print("Database exists but missing total_fare_amount column, recreating...")
+                    print("Database exists but uses an older schema, recreating...")
                     conn.close()
-                    os.remove(db_path)
+                    remove_database()
             except:
                 print("Existing database corrupted, recreating...")
-                os.remove(db_path)
+                remove_database()
         
         print("Loading FHVHV data from:", FHVHV_PATH)
         
@@ -89,19 +381,31 @@ def init_database():
         for file in parquet_files:
             print(f"  {os.path.basename(file)}")
         
-        # Create SQLite connection
+        # Clean files in parallel worker processes; this process stays the single SQLite writer.
+        # Each worker holds a full file's batches in memory, so by default only a few run at once
+        default_workers = min(os.cpu_count() or 1, len(parquet_files), MAX_DEFAULT_INGEST_WORKERS)
+        workers = int(os.environ.get('INGEST_WORKERS', default_workers))
+        print(f"Cleaning files with {workers} worker processes...")
+        
+        # Create SQLite connection tuned for a one-off bulk load
         conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA page_size = 8192")  # only takes effect on a new, empty database
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -524288")  # 512 MB
+        conn.execute("PRAGMA locking_mode = EXCLUSIVE")
         
         # Create table with optimized schema INCLUDING total_fare_amount
         conn.execute('''
             CREATE TABLE IF NOT EXISTS fhvhv (
                 PULocationID INTEGER,
                 DOLocationID INTEGER,
-                pickup_datetime TEXT,
+                pickup_datetime INTEGER,
                 pickup_hour INTEGER,
                 day_of_week INTEGER,
                 pickup_month INTEGER,
-                day_type TEXT,
+                day_type INTEGER,
                 trip_miles REAL,
                 duration_minutes REAL,
                 price_per_mile REAL,
@@ -111,122 +415,50 @@ def init_database():
         ''')
         
         total_records = 0
-        for i, file_path in enumerate(parquet_files):
-            print(f"Processing file {i+1}/{len(parquet_files)}: {os.path.basename(file_path)}")
+        spill_dir = tempfile.mkdtemp(prefix='fhvhv_ingest_')
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(process_file, file_path, spill_dir) for file_path in parquet_files]
+                for i, (file_path, future) in enumerate(zip(parquet_files, futures)):
+                    print(f"Processing file {i+1}/{len(parquet_files)}: {os.path.basename(file_path)}")
             
-            try:
-                # Read parquet file in chunks to avoid memory issues
-                print(f"  Reading {os.path.basename(file_path)}...")
-                df = pd.read_parquet(file_path)
-                
-                print(f"  Loaded {len(df):,} raw records")
-                
-                # Basic data cleaning
-                print("  Cleaning data...")
-                df = df.dropna(subset=['pickup_datetime', 'dropoff_datetime', 'PULocationID', 'DOLocationID'])
-                df = df[(df['trip_miles'] > 0) & (df['trip_time'] > 0)]
-                
-                print(f"  After cleaning: {len(df):,} records")
-                
-                if len(df) == 0:
-                    print("  No valid records after cleaning, skipping...")
-                    continue
-                
-                # Convert datetime and filter for 2024 (double check)
-                df['pickup_datetime'] = pd.to_datetime(df['pickup_datetime'])
-                df = df[df['pickup_datetime'].dt.year == 2024]
-                
-                print(f"  After 2024 filter: {len(df):,} records")
-                
-                if len(df) == 0:
-                    print("  No 2024 records found, skipping...")
-                    continue
-                
-                # Add calculated fields efficiently
-                print("  Adding calculated fields...")
-                df['pickup_hour'] = df['pickup_datetime'].dt.hour
-                df['day_of_week'] = df['pickup_datetime'].dt.dayofweek
-                df['pickup_month'] = df['pickup_datetime'].dt.month
-                
-                # Calculate day type
-                df['day_type'] = df['day_of_week'].apply(lambda x: 'weekend' if x in [5, 6] else 'weekday')
-                
-                # Calculate total fare amount - THIS IS THE KEY ADDITION
-                total_fare = (
-                    df['base_passenger_fare'].fillna(0) + 
-                    df['tolls'].fillna(0) + 
-                    df['bcf'].fillna(0) + 
-                    df['sales_tax'].fillna(0) + 
-                    df['congestion_surcharge'].fillna(0) + 
-                    df['airport_fee'].fillna(0)
-                )
-                df['total_fare_amount'] = total_fare
-                
-                # Calculate price per mile safely
-                df['price_per_mile'] = total_fare / df['trip_miles']
-                
-                # Calculate duration in minutes
-                df['duration_minutes'] = df['trip_time'] / 60.0
-                
-                # Calculate wait time in minutes (simplified)
-                if 'on_scene_datetime' in df.columns and 'request_datetime' in df.columns:
                     try:
-                        df['request_datetime'] = pd.to_datetime(df['request_datetime'])
-                        df['on_scene_datetime'] = pd.to_datetime(df['on_scene_datetime'])
-                        wait_time = (df['on_scene_datetime'] - df['request_datetime']).dt.total_seconds() / 60.0
-                        df['wait_time_minutes'] = wait_time.fillna(0).clip(0, 60)  # Cap at 60 minutes
-                    except:
-                        df['wait_time_minutes'] = 0
-                else:
-                    df['wait_time_minutes'] = 0
-                
-                # Select essential columns INCLUDING total_fare_amount
-                columns_to_keep = [
-                    'PULocationID', 'DOLocationID', 'pickup_datetime',
-                    'pickup_hour', 'day_of_week', 'pickup_month', 'day_type',
-                    'trip_miles', 'duration_minutes', 'price_per_mile', 'total_fare_amount', 'wait_time_minutes'
-                ]
-                
-                df_clean = df[columns_to_keep].copy()
-                
-                # Filter out extreme outliers to save space and improve quality
-                df_clean = df_clean[
-                    (df_clean['price_per_mile'] > 0) & 
-                    (df_clean['price_per_mile'] < 50) &  # Remove extreme prices
-                    (df_clean['total_fare_amount'] > 0) & 
-                    (df_clean['total_fare_amount'] < 500) &  # Remove extreme total fares
-                    (df_clean['duration_minutes'] > 1) & 
-                    (df_clean['duration_minutes'] < 300) &  # Remove extreme durations
-                    (df_clean['trip_miles'] < 100)  # Remove extreme distances
-                ]
-                
-                print(f"  After outlier removal: {len(df_clean):,} records")
+                        spill_path, records_added = future.result()
                 
-                # Write to SQLite in smaller batches
-                print("  Writing to database...")
-                df_clean.to_sql('fhvhv', conn, if_exists='append', index=False, method='multi', chunksize=10000)
+                        if records_added == 0:
+                            print("  No valid 2024 records found, skipping...")
+                            continue
                 
-                records_added = len(df_clean)
-                total_records += records_added
-                print(f"  Added {records_added:,} records from {os.path.basename(file_path)}")
+                        # Bulk insert the spilled batches, one transaction per file
+                        insert_spilled_trips(conn, spill_path)
+                        os.remove(spill_path)
                 
-                # Free memory
-                del df, df_clean
+                        total_records += records_added
+                        print(f"  Added {records_added:,} records from {os.path.basename(file_path)}")
                 
-            except Exception as e:
-                print(f"  Error processing {file_path}: {str(e)}")
-                continue
+                    except Exception as e:
+                        print(f"  Error processing {file_path}: {str(e)}")
+                        continue
+        finally:
+            # Spilled batches can add up to several GB; never leave them behind, even on failure
+            shutil.rmtree(spill_dir, ignore_errors=True)
+        
+        # Precompute per-route aggregates for the route analysis endpoint
+        print("Building route summary tables...")
+        build_route_stats(conn)
+        build_high_impact_stats(conn)
         
-        # Create indexes for better performance
-        print("Creating database indexes...")
-        cursor = conn.cursor()
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pu_do ON fhvhv(PULocationID, DOLocationID)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pickup_hour ON fhvhv(pickup_hour)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_day_of_week ON fhvhv(day_of_week)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pickup_month ON fhvhv(pickup_month)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_day_type ON fhvhv(day_type)")
+        # Gather table statistics for the query planner
+        print("Analyzing table statistics...")
+        conn.execute("ANALYZE")
+        check_query_plans(conn)
         
+        # Stamp the schema version last, in the final transaction, so an interrupted load is never
+        # mistaken for a finished one on the next start
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
+        # Checkpoint and drop the WAL so the finished database is a single self-contained file
+        conn.execute("PRAGMA journal_mode = DELETE")
         conn.close()
         
         if total_records == 0:
@@ -242,12 +474,56 @@ def init_database():
         print(traceback.format_exc())
         return False
 
-def get_db_connection():
-    """Get SQLite database connection"""
-    return sqlite3.connect(db_path)
+class ConnectionPool:
+    """Bounded pool of warm read-only SQLite connections shared by the serving threads"""
+    
+    def __init__(self, size):
+        self._idle = queue.LifoQueue()  # LIFO hands out the most recently used, hottest connection
+        self._slots = threading.BoundedSemaphore(size)
+    
+    def _open(self):
+        # The database is never written after init_database, so open it read-only and immutable:
+        # SQLite skips locking and change detection, and mmap turns page reads into memory loads
+        conn = sqlite3.connect(
+            f"file:{db_path}?mode=ro&immutable=1", uri=True,
+            check_same_thread=False, cached_statements=256
+        )
+        conn.execute("PRAGMA mmap_size = 34359738368")  # 32 GB, i.e. the whole file
+        conn.execute("PRAGMA cache_size = -65536")  # 64 MB per connection
+        conn.execute("PRAGMA temp_store = MEMORY")  # ORDER BY / window sorts never spill to temp files
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+    
+    @contextlib.contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with block"""
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+
+db_pool = ConnectionPool(int(os.environ.get('DB_POOL_SIZE', '10')))
+
+def zones_version():
+    """Modification time of the uploaded zones GeoJSON, or None before any upload"""
+    try:
+        return os.stat(zones_geojson_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
 
 def get_zone_names():
     """Load zone names from uploaded shapefile or return default mapping"""
+    # Keyed on the file's version so every worker picks up an upload, not just the one that handled it
+    return _load_zone_names(zones_version())
+
+@functools.lru_cache(maxsize=1)
+def _load_zone_names(version):
+    """Zone names for one version of the zones GeoJSON"""
     zone_names = {}
     
     # Try to load from uploaded shapefile first
@@ -269,81 +545,37 @@ def get_zone_names():
     
     # If no zones loaded from shapefile, use default NYC taxi zones mapping
     if not zone_names:
-        zone_names = {
-            1: "Newark Airport", 2: "Jamaica Bay", 3: "Allerton/Pelham Gardens", 4: "Alphabet City",
-            5: "Arden Heights", 6: "Arrochar/Fort Wadsworth", 7: "Astoria", 8: "Astoria Park",
-            9: "Auburndale", 10: "Baisley Park", 11: "Bath Beach", 12: "Battery Park",
-            13: "Battery Park City", 14: "Bay Ridge", 15: "Bay Terrace/Fort Totten", 16: "Bayside",
-            17: "Bedford", 18: "Bedford Park", 19: "Bellerose", 20: "Belmont", 21: "Bensonhurst East",
-            22: "Bensonhurst West", 23: "Bloomfield/Emerson Hill", 24: "Bloomingdale", 25: "Boerum Hill",
-            26: "Borough Park", 27: "Breezy Point/Fort Tilden/Riis Beach", 28: "Brighton Beach",
-            29: "Broad Channel", 30: "Bronx Park", 31: "Bronxdale", 32: "Brooklyn Heights",
-            33: "Brooklyn Navy Yard", 34: "Brownsville", 35: "Bushwick North", 36: "Bushwick South",
-            37: "Cambria Heights", 38: "Canarsie", 39: "Carroll Gardens", 40: "Central Harlem",
-            41: "Central Harlem North", 42: "Central Park", 43: "Charleston/Tottenville", 44: "Chinatown",
-            45: "City Island", 46: "Claremont/Bathgate", 47: "Clinton East", 48: "Clinton West",
-            49: "Co-Op City", 50: "Cobble Hill", 51: "College Point", 52: "Columbia Street",
-            53: "Coney Island", 54: "Corona", 55: "Country Club", 56: "Crotona Park",
-            57: "Crotona Park East", 58: "Crown Heights North", 59: "Crown Heights South",
-            60: "Cypress Hills", 61: "DUMBO/Vinegar Hill", 62: "Douglaston", 63: "Downtown Brooklyn/MetroTech",
-            64: "Dyker Heights", 65: "East Chelsea", 66: "East Concourse/Concourse Village",
-            67: "East Elmhurst", 68: "East Flatbush/Farragut", 69: "East Flatbush/Remsen Village",
-            70: "East Harlem North", 71: "East Harlem South", 72: "East New York",
-            73: "East New York/Pennsylvania Avenue", 74: "East Tremont", 75: "East Village",
-            76: "East Williamsburg", 77: "Eastchester", 78: "Elmhurst", 79: "Elmhurst/Maspeth",
-            80: "Eltingville/Annadale/Prince's Bay", 81: "Far Rockaway", 82: "Financial District North",
-            83: "Financial District South", 84: "Flatbush/Ditmas Park", 85: "Flatiron",
-            86: "Flatlands", 87: "Flushing", 88: "Flushing Meadows-Corona Park", 89: "Fordham South",
-            90: "Forest Hills", 91: "Fort Greene", 92: "Fresh Meadows", 93: "Freshkills Park",
-            94: "Garment District", 95: "Glen Oaks", 96: "Glendale", 97: "Governor's Island/Ellis Island/Liberty Island",
-            98: "Gowanus", 99: "Gramercy", 100: "Gravesend", 101: "Great Kills", 102: "Greenpoint",
-            103: "Greenwich Village North", 104: "Greenwich Village South", 105: "Grymes Hill/Clifton",
-            106: "Hamilton Heights", 107: "Hammels/Arverne", 108: "Hampton Bays", 109: "Heartland Village/Todt Hill",
-            110: "Highbridge", 111: "Hollis", 112: "Homecrest", 113: "Howard Beach", 114: "Hunts Point",
-            115: "Inwood", 116: "Inwood Hill Park", 117: "Jackson Heights", 118: "Jamaica",
-            119: "Jamaica Estates", 120: "JFK Airport", 121: "Kensington", 122: "Kew Gardens",
-            123: "Kew Gardens Hills", 124: "Kingsbridge Heights", 125: "Kips Bay", 126: "LaGuardia Airport",
-            127: "Laurelton", 128: "Lenox Hill East", 129: "Lenox Hill West", 130: "Lincoln Square East",
-            131: "Lincoln Square West", 132: "Little Italy/NoLiTa", 133: "Long Island City/Hunters Point",
-            134: "Long Island City/Queens Plaza", 135: "Longwood", 136: "Lower East Side",
-            137: "Madison", 138: "Manhattanville", 139: "Marble Hill", 140: "Marine Park/Floyd Bennett Field",
-            141: "Mariners Harbor", 142: "Maspeth", 143: "Meatpacking/West Village West", 144: "Melrose South",
-            145: "Middle Village", 146: "Midtown Center", 147: "Midtown East", 148: "Midtown North",
-            149: "Midtown South", 150: "Midwood", 151: "Morningside Heights", 152: "Morrisania/Melrose",
-            153: "Mott Haven/Port Morris", 154: "Mount Hope", 155: "Murray Hill", 156: "Murray Hill-Queens",
-            157: "New Dorp/Midland Beach", 158: "New Springville/Bloomfield/Travis", 159: "North Corona",
-            160: "Norwood", 161: "Oakland Gardens", 162: "Oakwood", 163: "Ocean Hill", 164: "Ocean Parkway South",
-            165: "Old Astoria", 166: "Ozone Park", 167: "Park Slope", 168: "Parkchester", 169: "Pelham Bay",
-            170: "Pelham Bay Park", 171: "Pelham Parkway", 172: "Penn Station/Madison Sq West", 173: "Port Richmond",
-            174: "Prospect-Lefferts Gardens", 175: "Prospect Heights", 176: "Prospect Park", 177: "Queens Village",
-            178: "Queensboro Hill", 179: "Queensbridge/Ravenswood", 180: "Randalls Island", 181: "Red Hook",
-            182: "Rego Park", 183: "Richmond Hill", 184: "Ridgewood", 185: "Rikers Island",
-            186: "Riverdale/North Riverdale/Fieldston", 187: "Rockaway Park", 188: "Roosevelt Island",
-            189: "Rosedale", 190: "Rossville/Woodrow", 191: "Saint Albans", 192: "Saint George/New Brighton",
-            193: "Saint Michaels Cemetery/Woodside", 194: "Schuylerville/Throgs Neck/Edgewater Park", 195: "Seagate/Coney Island",
-            196: "Sheepshead Bay", 197: "SoHo", 198: "Soundview/Bruckner", 199: "Soundview/Castle Hill",
-            200: "South Beach/Dongan Hills", 201: "South Jamaica", 202: "South Ozone Park", 203: "South Williamsburg",
-            204: "Springfield Gardens North", 205: "Springfield Gardens South", 206: "Spuyten Duyvil/Kingsbridge",
-            207: "Stapleton", 208: "Stuy Town/Peter Cooper Village", 209: "Stuyvesant Heights",
-            210: "Sunnyside", 211: "Sunset Park East", 212: "Sunset Park West", 213: "Sutton Place/Turtle Bay East",
-            214: "Theater District", 215: "Times Sq/Theatre District", 216: "TriBeCa/Civic Center", 217: "Two Bridges/Seward Park",
-            218: "Union Sq", 219: "University Heights/Morris Heights", 220: "Upper East Side North",
-            221: "Upper East Side South", 222: "Upper West Side North", 223: "Upper West Side South",
-            224: "Van Cortlandt Village", 225: "Van Cortlandt Park", 226: "Van Nest/Morris Park", 227: "Washington Heights North",
-            228: "Washington Heights South", 229: "West Brighton", 230: "West Chelsea/Hudson Yards", 231: "West Concourse",
-            232: "West Farms/Bronx River", 233: "West Village", 234: "Westchester Village/Unionport",
-            235: "Westerleigh", 236: "Whitestone", 237: "Willets Point", 238: "Williamsbridge/Olinville",
-            239: "Williamsburg (North Side)", 240: "Williamsburg (South Side)", 241: "Windsor Terrace", 242: "Woodhaven",
-            243: "Woodlawn/Wakefield", 244: "Woodside", 245: "World Trade Center", 246: "Yorkville East",
-            247: "Yorkville West", 248: "Allerton/Pelham Gardens", 249: "Kingsbridge Heights", 250: "Borough Park",
-            251: "Canarsie", 252: "Sheepshead Bay", 253: "Park Slope", 254: "Crown Heights South",
-            255: "East New York", 256: "Flatbush/Ditmas Park", 257: "Sunset Park West", 258: "Bensonhurst East",
-            259: "Bay Ridge", 260: "Red Hook", 261: "Carroll Gardens", 262: "DUMBO/Vinegar Hill",
-            263: "Downtown Brooklyn/MetroTech", 264: "Fort Greene", 265: "Boerum Hill"
-        }
+        with open(default_zones_path, 'r') as f:
+            zone_names = {int(zone_id): name for zone_id, name in json.load(f).items()}
     
     return zone_names
 
+def get_zone_name_list():
+    """Zone names indexed by LocationID, with a "Zone N" placeholder for unnamed IDs"""
+    return _zone_name_list(zones_version())
+
+@functools.lru_cache(maxsize=1)
+def _zone_name_list(version):
+    """Zone name list for one version of the zones GeoJSON"""
+    zone_names = _load_zone_names(version)
+    size = max(266, max(zone_names, default=0) + 1)
+    return [zone_names.get(zone_id) or f"Zone {zone_id}" for zone_id in range(size)]
+
+def get_zone_index():
+    """Load the uploaded zones as a GeoDataFrame with a built spatial index"""
+    return _load_zone_index(zones_version())
+
+@functools.lru_cache(maxsize=1)
+def _load_zone_index(version):
+    """Zone GeoDataFrame and spatial index for one version of the zones GeoJSON"""
+    gdf = gpd.read_file(zones_geojson_path)
+    gdf['zone_id'] = None
+    for col in ('LocationID', 'OBJECTID', 'zone_id', 'id', 'Zone'):
+        if col in gdf.columns:
+            gdf['zone_id'] = gdf['zone_id'].fillna(gdf[col])
+    gdf.sindex  # build the R-tree up front rather than on the first lookup
+    return gdf
+
 def process_shapefile(file_path):
     """Process uploaded shapefile and convert to GeoJSON"""
     if not GEOPANDAS_AVAILABLE:
@@ -376,12 +608,23 @@ def process_shapefile(file_path):
         elif gdf.crs != 'EPSG:4326':
             gdf = gdf.to_crs('EPSG:4326')
         
-        # Convert to GeoJSON
-        geojson_data = json.loads(gdf.to_json())
+        # Drop vertices closer than ~10m; invisible at dashboard zoom but shrinks the payload several times
+        gdf['geometry'] = gdf.geometry.simplify(ZONE_SIMPLIFY_TOLERANCE, preserve_topology=True)
         
-        # Save to file
+        # Convert to GeoJSON; per-feature bboxes let the dashboard cull zones without walking their coordinates
+        geojson_data = json.loads(gdf.to_json(show_bbox=True))
+        
+        # Save to file, one feature per line so the dashboard can draw zones while they download
         with open(zones_geojson_path, 'w') as f:
-            json.dump(geojson_data, f)
+            f.write('{"type": "FeatureCollection", "features": [\n')
+            f.write(',\n'.join(json.dumps(feature) for feature in geojson_data['features']))
+            f.write('\n]}\n')
+        
+        # Keep precompressed copies for clients that accept brotli or gzip
+        with open(zones_geojson_path, 'rb') as src, gzip.open(zones_geojson_path + '.gz', 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        with open(zones_geojson_path, 'rb') as src, open(zones_geojson_path + '.br', 'wb') as dst:
+            dst.write(brotli.compress(src.read()))
         
         # Clean up temporary directory
         shutil.rmtree(temp_dir)
@@ -394,10 +637,35 @@ def process_shapefile(file_path):
             shutil.rmtree(temp_dir, ignore_errors=True)
         raise e
 
+def preferred_encoding():
+    """Best precompressed encoding the client accepts, or None"""
+    return next((encoding for encoding in PRECOMPRESSED_SUFFIXES if encoding in request.accept_encodings), None)
+
 @app.route('/')
 def index():
     """Serve the main dashboard"""
-    return render_template_string(DASHBOARD_HTML)
+    encoding = preferred_encoding()
+    response = Response(DASHBOARD_ENCODED[encoding], mimetype='text/html')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(DASHBOARD_ETAG + (f'-{encoding}' if encoding else ''))
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    response.cache_control.must_revalidate = True
+    # The page has no inline scripts or handlers, so scripts are limited to this origin and the library CDNs
+    response.headers['Content-Security-Policy'] = "script-src 'self' https://unpkg.com https://cdn.jsdelivr.net"
+    response.vary.add('Accept-Encoding')
+    return response.make_conditional(request)
+
+@app.after_request
+def cache_versioned_static(response):
+    """Static files requested with a content hash never change, so browsers keep them for a year"""
+    if request.endpoint == 'static' and request.args.get('v') and response.status_code == 200:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = 365 * 24 * 3600
+        response.cache_control.immutable = True
+    return response
 
 @app.route('/upload-zones', methods=['POST'])
 def upload_zones():
@@ -442,8 +710,18 @@ def get_taxi_zones():
     """Get taxi zones from uploaded shapefile or default"""
     try:
         if os.path.exists(zones_geojson_path):
-            with open(zones_geojson_path, 'r') as f:
-                return jsonify(json.load(f))
+            # Stream the saved file as-is; ETag/Last-Modified let browsers revalidate with a 304
+            path = os.path.abspath(zones_geojson_path)
+            encoding = preferred_encoding()
+            encoded_path = path + PRECOMPRESSED_SUFFIXES[encoding] if encoding else None
+            if encoded_path and os.path.exists(encoded_path) \
+                    and os.path.getmtime(encoded_path) >= os.path.getmtime(path):
+                response = send_file(encoded_path, mimetype='application/json', conditional=True, max_age=0)
+                response.headers['Content-Encoding'] = encoding
+            else:
+                response = send_file(path, mimetype='application/json', conditional=True, max_age=0)
+            response.vary.add('Accept-Encoding')
+            return response
         else:
             # Return empty GeoJSON if no zones uploaded
             return jsonify({
@@ -454,6 +732,127 @@ def get_taxi_zones():
         print(f"Error loading zones: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/zone-at')
+def zone_at():
+    """Find the taxi zone containing a lat/lon point"""
+    try:
+        lat = request.args.get('lat', type=float)
+        lon = request.args.get('lon', type=float)
+        
+        if lat is None or lon is None:
+            return jsonify({"error": "Missing lat or lon"}), 400
+        
+        if not GEOPANDAS_AVAILABLE:
+            return jsonify({"error": "Zone lookup not available. GeoPandas is not installed."}), 500
+        
+        if not os.path.exists(zones_geojson_path):
+            return jsonify({"error": "No taxi zones uploaded"}), 404
+        
+        # R-tree bounding box prefilter, then an exact containment test on the candidates
+        gdf = get_zone_index()
+        matches = gdf.sindex.query(Point(lon, lat), predicate='intersects')
+        if len(matches) == 0:
+            return jsonify({"error": f"No zone found at {lat}, {lon}"}), 404
+        
+        zone_id = int(gdf['zone_id'].iloc[matches[0]])
+        return jsonify({
+            "zone_id": zone_id,
+            "zone_name": get_zone_names().get(zone_id, f"Zone {zone_id}")
+        })
+        
+    except Exception as e:
+        log.exception("Zone lookup failed")
+        return jsonify({"error": str(e)}), 500
+
+def route_stats_sql(day_filter):
+    """SQL fetching one route's summary, hourly, daily and monthly stats in one round trip"""
+    # Filter on the precomputed per-route summary tables
+    route_filter = f"""
+        WHERE PULocationID = ? 
+        AND DOLocationID = ?
+        {day_filter}
+    """
+    
+    # Averages are rebuilt from the stored sums so they match a scan of fhvhv;
+    # COALESCE turns an empty route into zeros so rows serialize without per-cell casts
+    metrics = """
+            COALESCE(SUM(trips), 0) as volume,
+            COALESCE(SUM(sum_price_per_mile) / SUM(trips), 0) as price_per_mile,
+            COALESCE(SUM(sum_total_fare) / SUM(trips), 0) as total_fare_amount,
+            COALESCE(SUM(sum_duration) / SUM(trips), 0) as avg_duration,
+            COALESCE(SUM(sum_wait_time) / SUM(trips), 0) as avg_wait_time
+    """
+    
+    # Summary, hourly, daily and monthly rows tagged by grp
+    return f"""
+        SELECT 0 as grp, NULL as bucket, {metrics}
+        FROM route_hour_stats
+        {route_filter}
+        UNION ALL
+        SELECT 1, pickup_hour, {metrics}
+        FROM route_hour_stats
+        {route_filter}
+        GROUP BY pickup_hour
+        UNION ALL
+        SELECT 2, day_of_week, {metrics}
+        FROM route_day_stats
+        {route_filter}
+        GROUP BY day_of_week
+        UNION ALL
+        SELECT 3, pickup_month, {metrics}
+        FROM route_month_stats
+        {route_filter}
+        GROUP BY pickup_month
+        ORDER BY grp, bucket
+    """
+
+# Route analysis SQL per day type, built once so every call reuses the same prepared statement
+ROUTE_STATS_SQL = {
+    'all': route_stats_sql(""),
+    'weekday': route_stats_sql("AND day_type = 0"),
+    'weekend': route_stats_sql("AND day_type = 1"),
+}
+
+def series_columns(rows, key):
+    """One list per field of a route analysis series (bucket key, then the metrics), so the client gets columns"""
+    fields = (key, *ROUTE_METRIC_KEYS)
+    columns = zip(*rows) if rows else [()] * len(fields)
+    return {field: list(values) for field, values in zip(fields, columns)}
+
+@functools.lru_cache(maxsize=8192)
+def _route_stats(pickup_zone, dropoff_zone, day_type):
+    """Build the serialized route analysis for one route, or None if it has no trips"""
+    with db_pool.connection() as conn:
+        rows = conn.execute(ROUTE_STATS_SQL[day_type], (pickup_zone, dropoff_zone) * 4).fetchall()
+    groups = {0: [], 1: [], 2: [], 3: []}
+    for row in rows:
+        groups[row[0]].append(row[1:])
+    
+    # Check if we have data for this route
+    volume, price_per_mile, total_fare_amount, avg_duration, avg_wait_time = groups[0][0][1:]
+    if not volume:
+        return None
+    
+    log.debug("Found %d trips for route %s -> %s", volume, pickup_zone, dropoff_zone)
+    
+    # Format the response INCLUDING total fare amount
+    response = {
+        "summary": {
+            "total_trips": volume,
+            "avg_duration": avg_duration,
+            "avg_price_mile": price_per_mile,
+            "avg_total_fare": total_fare_amount,
+            "avg_wait_time": avg_wait_time
+        },
+        "hourly": series_columns(groups[1], 'hour'),
+        "daily": series_columns(groups[2], 'day_of_week'),
+        "monthly": series_columns(groups[3], 'month')
+    }
+    response["daily"]["day"] = [DAY_NAMES[day] for day in response["daily"]["day_of_week"]]
+    response["monthly"]["month_name"] = [f"{MONTH_NAMES[month - 1]} 2024" for month in response["monthly"]["month"]]
+    
+    return orjson.dumps(response)
+
 @app.route('/api/route-analysis')
 def analyze_route():
     """Analyze route between two zones with REAL data including total fare amount"""
@@ -465,189 +864,166 @@ def analyze_route():
         if not pickup_zone or not dropoff_zone:
             return jsonify({"error": "Missing pickup or dropoff zone"}), 400
         
-        print(f"Analyzing route: {pickup_zone} -> {dropoff_zone} ({day_type})")
-        
-        # Build day type filter
-        day_filter = ""
-        if day_type == 'weekday':
-            day_filter = "AND day_type = 'weekday'"
-        elif day_type == 'weekend':
-            day_filter = "AND day_type = 'weekend'"
-        
-        # Base query for the route
-        base_query = f"""
-            FROM fhvhv 
-            WHERE PULocationID = {pickup_zone} 
-            AND DOLocationID = {dropoff_zone}
-            {day_filter}
-            AND PULocationID != 265
-            AND DOLocationID != 265
-            AND price_per_mile > 0 
-            AND total_fare_amount > 0
-            AND duration_minutes > 0
-            AND wait_time_minutes >= 0
-        """
+        # Unknown day types mean all days; normalize so they share one cache entry
+        if day_type not in ('weekday', 'weekend'):
+            day_type = 'all'
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        log.debug("Analyzing route: %s -> %s (%s)", pickup_zone, dropoff_zone, day_type)
         
-        # Check if we have data for this route
-        count_query = f"SELECT COUNT(*) {base_query}"
-        cursor.execute(count_query)
-        count_result = cursor.fetchone()
-        
-        if count_result[0] == 0:
-            conn.close()
+        # The loaded data is static, so repeat lookups are served from the cache
+        body = _route_stats(pickup_zone, dropoff_zone, day_type)
+        if body is None:
             return jsonify({
                 "error": f"No trips found for route {pickup_zone} -> {dropoff_zone}",
                 "total_trips": 0
             }), 404
         
-        print(f"Found {count_result[0]:,} trips for this route")
-        
-        # Get summary statistics INCLUDING total fare amount
-        summary_query = f"""
-            SELECT 
-                COUNT(*) as total_trips,
-                AVG(duration_minutes) as avg_duration,
-                AVG(price_per_mile) as avg_price_mile,
-                AVG(total_fare_amount) as avg_total_fare,
-                AVG(wait_time_minutes) as avg_wait_time
-            {base_query}
-        """
-        
-        cursor.execute(summary_query)
-        summary_result = cursor.fetchone()
-        
-        # Get hourly data INCLUDING total fare amount
-        hourly_query = f"""
-            SELECT 
-                pickup_hour as hour,
-                COUNT(*) as volume,
-                AVG(price_per_mile) as price_per_mile,
-                AVG(total_fare_amount) as total_fare_amount,
-                AVG(duration_minutes) as avg_duration,
-                AVG(wait_time_minutes) as avg_wait_time
-            {base_query}
-            GROUP BY pickup_hour
-            ORDER BY pickup_hour
-        """
-        
-        cursor.execute(hourly_query)
-        hourly_results = cursor.fetchall()
-        
-        # Get daily data (day of week) INCLUDING total fare amount
-        daily_query = f"""
-            SELECT 
-                day_of_week,
-                CASE day_of_week 
-                    WHEN 0 THEN 'Monday'
-                    WHEN 1 THEN 'Tuesday'
-                    WHEN 2 THEN 'Wednesday'
-                    WHEN 3 THEN 'Thursday'
-                    WHEN 4 THEN 'Friday'
-                    WHEN 5 THEN 'Saturday'
-                    WHEN 6 THEN 'Sunday'
-                END as day_name,
-                COUNT(*) as volume,
-                AVG(price_per_mile) as price_per_mile,
-                AVG(total_fare_amount) as total_fare_amount,
-                AVG(duration_minutes) as avg_duration,
-                AVG(wait_time_minutes) as avg_wait_time
-            {base_query}  
-            GROUP BY day_of_week
-            ORDER BY day_of_week
-        """
-        
-        cursor.execute(daily_query)
-        daily_results = cursor.fetchall()
-        
-        # Get monthly data INCLUDING total fare amount
-        monthly_query = f"""
-            SELECT 
-                pickup_month,
-                CASE pickup_month
-                    WHEN 1 THEN 'Jan 2024'
-                    WHEN 2 THEN 'Feb 2024'
-                    WHEN 3 THEN 'Mar 2024'
-                    WHEN 4 THEN 'Apr 2024'
-                    WHEN 5 THEN 'May 2024'
-                    WHEN 6 THEN 'Jun 2024'
-                    WHEN 7 THEN 'Jul 2024'
-                    WHEN 8 THEN 'Aug 2024'
-                    WHEN 9 THEN 'Sep 2024'
-                    WHEN 10 THEN 'Oct 2024'
-                    WHEN 11 THEN 'Nov 2024'
-                    WHEN 12 THEN 'Dec 2024'
-                END as month_name,
-                COUNT(*) as volume,
-                AVG(price_per_mile) as price_per_mile,
-                AVG(total_fare_amount) as total_fare_amount,
-                AVG(duration_minutes) as avg_duration,
-                AVG(wait_time_minutes) as avg_wait_time
-            {base_query}
-            GROUP BY pickup_month
-            ORDER BY pickup_month
-        """
-        
-        cursor.execute(monthly_query)
-        monthly_results = cursor.fetchall()
-        
-        conn.close()
-        
-        # Format the response INCLUDING total fare amount
-        response = {
-            "summary": {
-                "total_trips": int(summary_result[0]),
-                "avg_duration": float(summary_result[1]) if summary_result[1] else 0,
-                "avg_price_mile": float(summary_result[2]) if summary_result[2] else 0,
-                "avg_total_fare": float(summary_result[3]) if summary_result[3] else 0,
-                "avg_wait_time": float(summary_result[4]) if summary_result[4] else 0
-            },
-            "hourly": [
-                {
-                    "hour": int(row[0]),
-                    "volume": int(row[1]),
-                    "price_per_mile": float(row[2]) if row[2] else 0,
-                    "total_fare_amount": float(row[3]) if row[3] else 0,
-                    "avg_duration": float(row[4]) if row[4] else 0,
-                    "avg_wait_time": float(row[5]) if row[5] else 0
-                }
-                for row in hourly_results
-            ],
-            "daily": [
-                {
-                    "day_of_week": int(row[0]),
-                    "day": row[1],
-                    "volume": int(row[2]),
-                    "price_per_mile": float(row[3]) if row[3] else 0,
-                    "total_fare_amount": float(row[4]) if row[4] else 0,
-                    "avg_duration": float(row[5]) if row[5] else 0,
-                    "avg_wait_time": float(row[6]) if row[6] else 0
-                }
-                for row in daily_results
-            ],
-            "monthly": [
-                {
-                    "month": int(row[0]),
-                    "month_name": row[1],
-                    "volume": int(row[2]),
-                    "price_per_mile": float(row[3]) if row[3] else 0,
-                    "total_fare_amount": float(row[4]) if row[4] else 0,
-                    "avg_duration": float(row[5]) if row[5] else 0,
-                    "avg_wait_time": float(row[6]) if row[6] else 0
-                }
-                for row in monthly_results
-            ]
-        }
-        
-        return jsonify(response)
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
-        print(f"Route analysis error: {str(e)}")
-        print(traceback.format_exc())
+        log.exception("Route analysis failed")
         return jsonify({"error": str(e)}), 500
 
+def top_routes_sql(table, bucket_filter, min_trips, price_order):
+    """SQL ranking one time bucket's routes by volume and by price from the precomputed route totals"""
+    route_json = """json_object(
+                'pickup_zone', pickup_zone,
+                'dropoff_zone', dropoff_zone,
+                'volume', volume,
+                'avg_total_fare', avg_total_fare,
+                'total_revenue', total_revenue,
+                'avg_duration', avg_duration,
+                'avg_distance', avg_distance
+            )"""
+    # SQLite renders both top 10 lists as JSON arrays itself, plus the zone IDs they use
+    return f"""
+        WITH agg AS (
+            SELECT 
+                PULocationID as pickup_zone,
+                DOLocationID as dropoff_zone,
+                trips as volume,
+                sum_total_fare / trips as avg_total_fare,
+                sum_total_fare as total_revenue,
+                sum_duration / trips as avg_duration,
+                sum_distance / trips as avg_distance
+            FROM {table}
+            WHERE {bucket_filter}
+              AND trips >= {min_trips}
+        ),
+        ranked AS MATERIALIZED (
+            SELECT * FROM (
+                SELECT *,
+                    ROW_NUMBER() OVER (ORDER BY volume DESC, total_revenue DESC) as volume_rank,
+                    ROW_NUMBER() OVER (ORDER BY {price_order}) as price_rank
+                FROM agg
+            )
+            WHERE volume_rank <= 10 OR price_rank <= 10
+        )
+        SELECT
+            (SELECT json_group_array({route_json})
+             FROM (SELECT * FROM ranked WHERE volume_rank <= 10 ORDER BY volume_rank)),
+            (SELECT json_group_array({route_json})
+             FROM (SELECT * FROM ranked WHERE price_rank <= 10 ORDER BY price_rank)),
+            (SELECT group_concat(zone_id)
+             FROM (SELECT pickup_zone as zone_id FROM ranked UNION SELECT dropoff_zone FROM ranked))
+    """
+
+# Top 10 by price (avg_total_fare), ties broken by volume
+DAY_HOUR_TOP_ROUTES_SQL = top_routes_sql(
+    'route_dayhour_totals', "day_of_week = ? AND pickup_hour = ?",
+    min_trips=5, price_order="avg_total_fare DESC, volume DESC"
+)
+
+# Top 10 by total price (revenue) (tie-breaker: volume)
+MONTH_TOP_ROUTES_SQL = top_routes_sql(
+    'route_month_totals', "pickup_month = ?",
+    min_trips=20, price_order="total_revenue DESC, volume DESC"
+)
+
+def check_query_plans(conn):
+    """Log the high impact query plans and warn if a route totals table is not searched by its key"""
+    checks = [
+        ('high impact by day/hour', DAY_HOUR_TOP_ROUTES_SQL, (0, 0), 'route_dayhour_totals'),
+        ('high impact by month', MONTH_TOP_ROUTES_SQL, (1,), 'route_month_totals'),
+    ]
+    for label, query, params, table in checks:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+        print(f"  Query plan for {label}:")
+        for detail in plan:
+            print(f"    {detail}")
+        if not any(detail.startswith(f"SEARCH {table} USING PRIMARY KEY") for detail in plan):
+            print(f"  ⚠️  {label} does not search {table} by its primary key!")
+
+def top_routes(query, params):
+    """Top 10 routes by volume and by price for one time bucket, as JSON fragments, plus their zone names"""
+    with db_pool.connection() as conn:
+        volume_json, price_json, zone_ids = conn.execute(query, params).fetchone()
+
+    # Zone names are sent once per response rather than per row
+    zone_names = get_zone_name_list()
+    zones = {zone_id: zone_names[int(zone_id)] for zone_id in zone_ids.split(',')} if zone_ids else {}
+    return orjson.Fragment(volume_json), orjson.Fragment(price_json), zones
+
+@functools.lru_cache(maxsize=512)
+def _high_impact_by_day_hour(day, hour, version):
+    """Serialized top 10 routes by volume and by price for one day of week and hour (168 keys per data version)"""
+    volume_rows, price_rows, zones = top_routes(DAY_HOUR_TOP_ROUTES_SQL, (day, hour))
+
+    return orjson.dumps({
+        "day": day,
+        "day_name": DAY_NAMES[day],
+        "hour": hour,
+        "time_label": HOUR_LABELS[hour],
+        "top_by_volume": volume_rows,
+        "top_by_price": price_rows,
+        "zones": zones
+    })
+
+@functools.lru_cache(maxsize=16)
+def _high_impact_by_month(month, version):
+    """Serialized top 10 routes by volume and by revenue for one month and data version"""
+    volume_rows, price_rows, zones = top_routes(MONTH_TOP_ROUTES_SQL, (month,))
+
+    return orjson.dumps({
+        "month": month,
+        "month_name": MONTH_LABELS[month - 1],
+        "top_by_volume": volume_rows,
+        "top_by_price": price_rows,
+        "zones": zones
+    })
+
+def warm_high_impact_cache():
+    """Fill the high impact caches for every day/hour and month using parallel pooled connections"""
+    version = data_version()
+    keys = [(_high_impact_by_day_hour, (day, hour, version)) for day in VALID_DAYS for hour in VALID_HOURS]
+    keys += [(_high_impact_by_month, (month, version)) for month in VALID_MONTHS]
+    # sqlite3 releases the GIL while a query runs, so the lookups overlap on separate connections
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for future in [executor.submit(fn, *args) for fn, args in keys]:
+            future.result()
+    print(f"Warmed high impact cache with {len(keys)} entries")
+
+def data_version():
+    """Version tag of the loaded trip data and zone boundaries, used to build the API ETags"""
+    # Checked on every request: an upload in one worker must change the tag every worker sends
+    paths = [path for path in (db_path, zones_geojson_path) if os.path.exists(path)]
+    return '-'.join(f"{os.stat(path).st_mtime_ns:x}" for path in paths)
+
+def etag_matches(etag):
+    """Whether If-None-Match holds etag, including the ':<encoding>' form flask-compress sends"""
+    return any(tag.split(':')[0] == etag for tag in request.if_none_match.as_set(include_weak=True))
+
+def high_impact_response(etag, build, *args):
+    """Serve a cached high impact result, or a bare 304 if the client already holds this version"""
+    if etag_matches(etag):
+        response = Response(status=304)
+    else:
+        response = Response(build(*args), mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response
+
 # NEW API ENDPOINTS FOR HIGH IMPACT ROUTES
 @app.route('/api/high-impact-routes')
 def high_impact_routes_combined():
@@ -659,97 +1035,18 @@ def high_impact_routes_combined():
         day = request.args.get('day', type=int)     # 0=Mon ... 6=Sun
         hour = request.args.get('hour', type=int)   # 0..23
 
-        if day is None or day < 0 or day > 6:
+        if day not in VALID_DAYS:
             return jsonify({"error": "Invalid day. Must be 0-6 (0=Monday)"}), 400
-        if hour is None or hour < 0 or hour > 23:
+        if hour not in VALID_HOURS:
             return jsonify({"error": "Invalid hour. Must be 0-23"}), 400
 
-        day_names = ['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']
-        day_name = day_names[day]
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        base_sql = """
-            FROM fhvhv
-            WHERE day_of_week = ?
-              AND pickup_hour = ?
-              AND PULocationID != 265
-              AND DOLocationID != 265
-              AND total_fare_amount > 0
-              AND duration_minutes > 0
-            GROUP BY PULocationID, DOLocationID
-            HAVING COUNT(*) >= 5
-        """
-
-        # Top 10 by volume (ties broken by total revenue)
-        q_volume = f"""
-            SELECT 
-                PULocationID,
-                DOLocationID,
-                COUNT(*) as volume,
-                AVG(total_fare_amount) as avg_total_fare,
-                SUM(total_fare_amount) as total_revenue,
-                AVG(duration_minutes) as avg_duration,
-                AVG(trip_miles) as avg_distance
-            {base_sql}
-            ORDER BY volume DESC, total_revenue DESC
-            LIMIT 10
-        """
-
-        # Top 10 by price (avg_total_fare), ties broken by volume
-        q_price = f"""
-            SELECT 
-                PULocationID,
-                DOLocationID,
-                COUNT(*) as volume,
-                AVG(total_fare_amount) as avg_total_fare,
-                SUM(total_fare_amount) as total_revenue,
-                AVG(duration_minutes) as avg_duration,
-                AVG(trip_miles) as avg_distance
-            {base_sql}
-            ORDER BY avg_total_fare DESC, volume DESC
-            LIMIT 10
-        """
-
-        cursor.execute(q_volume, (day, hour))
-        volume_rows = cursor.fetchall()
-
-        cursor.execute(q_price, (day, hour))
-        price_rows = cursor.fetchall()
-        conn.close()
-
-        zone_names = get_zone_names()
-
-        def pack(rows):
-            out = []
-            for r in rows:
-                pu = int(r[0]); do = int(r[1])
-                out.append({
-                    "pickup_zone": pu,
-                    "dropoff_zone": do,
-                    "pickup_name": zone_names.get(pu, f"Zone {pu}"),
-                    "dropoff_name": zone_names.get(do, f"Zone {do}"),
-                    "volume": int(r[2]),
-                    "avg_total_fare": float(r[3]) if r[3] else 0.0,
-                    "total_revenue": float(r[4]) if r[4] else 0.0,
-                    "avg_duration": float(r[5]) if r[5] else 0.0,
-                    "avg_distance": float(r[6]) if r[6] else 0.0,
-                    "route_name": f"{zone_names.get(pu, f'Zone {pu}')} → {zone_names.get(do, f'Zone {do}')}"
-                })
-            return out
-
-        return jsonify({
-            "day": day,
-            "day_name": day_name,
-            "hour": hour,
-            "time_label": f"{hour}:00",
-            "top_by_volume": pack(volume_rows),
-            "top_by_price": pack(price_rows)
-        })
+        # Each (day, hour) is only aggregated once per version of the data and zone names
+        version = data_version()
+        etag = f"{version}-d{day}-h{hour}"
+        return high_impact_response(etag, _high_impact_by_day_hour, day, hour, version)
 
     except Exception as e:
-        print(f"High impact combined error: {e}")
+        log.exception("High impact routes by day/hour failed")
         return jsonify({"error": str(e)}), 500
 
 
@@ -763,96 +1060,18 @@ def high_impact_routes_by_month():
     """
     try:
         month = request.args.get('month', type=int)
-        if month is None or month < 1 or month > 12:
+        if month not in VALID_MONTHS:
             return jsonify({"error": "Invalid month. Must be between 1-12"}), 400
 
-        month_names = [
-            'January', 'February', 'March', 'April', 'May', 'June',
-            'July', 'August', 'September', 'October', 'November', 'December'
-        ]
-        month_name = month_names[month - 1]
-        print(f"Analyzing high impact routes for month: {month_name}")
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        log.debug("Analyzing high impact routes for month: %s", FULL_MONTH_NAMES[month - 1])
 
-        base_sql = """
-            FROM fhvhv
-            WHERE pickup_month = ?
-              AND PULocationID != 265
-              AND DOLocationID != 265
-              AND total_fare_amount > 0
-              AND duration_minutes > 0
-            GROUP BY PULocationID, DOLocationID
-            HAVING COUNT(*) >= 20
-        """
-
-        # Top 10 by volume (tie-breaker: total_revenue)
-        q_volume = f"""
-            SELECT 
-                PULocationID,
-                DOLocationID,
-                COUNT(*) as volume,
-                AVG(total_fare_amount) as avg_total_fare,
-                SUM(total_fare_amount) as total_revenue,
-                AVG(duration_minutes) as avg_duration,
-                AVG(trip_miles) as avg_distance
-            {base_sql}
-            ORDER BY volume DESC, total_revenue DESC
-            LIMIT 10
-        """
-
-        # Top 10 by total price (revenue) (tie-breaker: volume)
-        q_price = f"""
-            SELECT 
-                PULocationID,
-                DOLocationID,
-                COUNT(*) as volume,
-                AVG(total_fare_amount) as avg_total_fare,
-                SUM(total_fare_amount) as total_revenue,
-                AVG(duration_minutes) as avg_duration,
-                AVG(trip_miles) as avg_distance
-            {base_sql}
-            ORDER BY total_revenue DESC, volume DESC
-            LIMIT 10
-        """
-
-        cursor.execute(q_volume, (month,))
-        volume_rows = cursor.fetchall()
-
-        cursor.execute(q_price, (month,))
-        price_rows = cursor.fetchall()
-        conn.close()
-
-        zone_names = get_zone_names()
-
-        def pack(rows):
-            out = []
-            for r in rows:
-                pu = int(r[0]); do = int(r[1])
-                out.append({
-                    "pickup_zone": pu,
-                    "dropoff_zone": do,
-                    "pickup_name": zone_names.get(pu, f"Zone {pu}"),
-                    "dropoff_name": zone_names.get(do, f"Zone {do}"),
-                    "volume": int(r[2]),
-                    "avg_total_fare": float(r[3]) if r[3] else 0.0,
-                    "total_revenue": float(r[4]) if r[4] else 0.0,
-                    "avg_duration": float(r[5]) if r[5] else 0.0,
-                    "avg_distance": float(r[6]) if r[6] else 0.0,
-                    "route_name": f"{zone_names.get(pu, f'Zone {pu}')} → {zone_names.get(do, f'Zone {do}')}"
-                })
-            return out
-
-        return jsonify({
-            "month": month,
-            "month_name": f"{month_name} 2024",
-            "top_by_volume": pack(volume_rows),
-            "top_by_price": pack(price_rows)
-        })
+        # Each month is only aggregated once per version of the data and zone names
+        version = data_version()
+        etag = f"{version}-m{month}"
+        return high_impact_response(etag, _high_impact_by_month, month, version)
 
     except Exception as e:
-        print(f"High impact routes by month error: {str(e)}")
+        log.exception("High impact routes by month failed")
         return jsonify({"error": str(e)}), 500
 
 
@@ -860,11 +1079,8 @@ def high_impact_routes_by_month():
 def health_check():
     """Health check endpoint"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM fhvhv")
-        count = cursor.fetchone()[0]
-        conn.close()
+        with db_pool.connection() as conn:
+            count = trip_count(conn)
         
         zones_loaded = os.path.exists(zones_geojson_path)
         
@@ -882,1850 +1098,22 @@ def health_check():
             "error": str(e)
         }), 500
 
-# Dashboard HTML Template - Dark Theme WITH TOTAL FARE CHARTS AND NEW HIGH IMPACT ROUTES TABS
-DASHBOARD_HTML = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>NYC Taxi Analytics Dashboard</title>
-    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background-color: #0a0a0a;
-            color: #ffffff;
-            line-height: 1.6;
-            font-weight: 400;
-        }
-
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 32px 24px;
-        }
-
-        .header {
-            text-align: center;
-            margin-bottom: 48px;
-        }
-
-        .header h1 {
-            font-size: 2.5rem;
-            font-weight: 600;
-            color: #ffffff;
-            margin-bottom: 8px;
-            letter-spacing: -0.025em;
-        }
-
-        .header .subtitle {
-            font-size: 1.125rem;
-            color: #9ca3af;
-            font-weight: 400;
-        }
-
-        .upload-section {
-            background: #111111;
-            border: 1px solid #1f2937;
-            border-radius: 12px;
-            padding: 32px;
-            margin-bottom: 32px;
-            text-align: center;
-        }
-
-        .upload-title {
-            font-size: 1.25rem;
-            font-weight: 500;
-            color: #ffffff;
-            margin-bottom: 16px;
-        }
-
-        .upload-description {
-            color: #9ca3af;
-            margin-bottom: 24px;
-            font-size: 0.875rem;
-        }
-
-        .file-upload-container {
-            position: relative;
-            display: inline-block;
-        }
-
-        .file-upload-input {
-            position: absolute;
-            opacity: 0;
-            width: 100%;
-            height: 100%;
-            cursor: pointer;
-        }
-
-        .file-upload-button {
-            background: #ffffff;
-            color: #000000;
-            border: none;
-            border-radius: 8px;
-            padding: 12px 24px;
-            font-size: 0.875rem;
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.2s ease;
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-        }
-
-        .file-upload-button:hover {
-            background: #f3f4f6;
-            transform: translateY(-1px);
-        }
-
-        .controls {
-            background: #111111;
-            border: 1px solid #1f2937;
-            border-radius: 12px;
-            padding: 32px;
-            margin-bottom: 32px;
-        }
-
-        .controls h2 {
-            font-size: 1.5rem;
-            font-weight: 500;
-            color: #ffffff;
-            margin-bottom: 24px;
-        }
-
-        .map-container {
-            background: #111111;
-            border: 1px solid #1f2937;
-            border-radius: 12px;
-            padding: 32px;
-            margin-bottom: 32px;
-        }
-
-        .map-container h3 {
-            font-size: 1.25rem;
-            font-weight: 500;
-            color: #ffffff;
-            margin-bottom: 24px;
-        }
-
-        #map {
-            height: 500px;
-            border-radius: 8px;
-            border: 1px solid #1f2937;
-        }
-
-        .selection-info {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 16px;
-            margin-top: 24px;
-        }
-
-        .info-card {
-            background: #1f2937;
-            border: 1px solid #374151;
-            border-radius: 8px;
-            padding: 20px;
-            text-align: center;
-        }
-
-        .info-card h3 {
-            font-size: 0.75rem;
-            font-weight: 500;
-            color: #9ca3af;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-            margin-bottom: 8px;
-        }
-
-        .info-card .value {
-            font-size: 1.5rem;
-            font-weight: 600;
-            color: #ffffff;
-        }
-
-        .filter-controls {
-            display: flex;
-            gap: 16px;
-            align-items: flex-end;
-            margin-bottom: 24px;
-            flex-wrap: wrap;
-        }
-
-        .filter-group {
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
-        }
-
-        .filter-group label {
-            font-size: 0.875rem;
-            font-weight: 500;
-            color: #9ca3af;
-        }
-
-        select, button {
-            padding: 12px 16px;
-            border: 1px solid #374151;
-            border-radius: 8px;
-            font-size: 0.875rem;
-            background: #1f2937;
-            color: #ffffff;
-            transition: all 0.2s ease;
-        }
-
-        select:focus {
-            outline: none;
-            border-color: #6366f1;
-            box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.1);
-        }
-
-        .analyze-btn {
-            background: #ffffff;
-            color: #000000;
-            border: none;
-            padding: 12px 24px;
-            font-weight: 500;
-            cursor: pointer;
-            font-size: 0.875rem;
-            transition: all 0.2s ease;
-        }
-
-        .analyze-btn:hover {
-            background: #f3f4f6;
-            transform: translateY(-1px);
-        }
-
-        .analyze-btn:disabled {
-            background: #374151;
-            color: #6b7280;
-            cursor: not-allowed;
-            transform: none;
-        }
-
-        .tabs {
-            background: #111111;
-            border: 1px solid #1f2937;
-            border-radius: 12px;
-            margin-bottom: 32px;
-            overflow: hidden;
-        }
-
-        .tab-headers {
-            display: flex;
-            border-bottom: 1px solid #1f2937;
-            flex-wrap: wrap;
-        }
-
-        .tab-header {
-            flex: 1;
-            padding: 16px 24px;
-            text-align: center;
-            cursor: pointer;
-            background: transparent;
-            border: none;
-            font-size: 0.875rem;
-            font-weight: 500;
-            color: #9ca3af;
-            transition: all 0.2s ease;
-            min-width: 120px;
-        }
-
-        .tab-header.active {
-            background: #1f2937;
-            color: #ffffff;
-        }
-
-        .tab-content {
-            display: none;
-            padding: 32px;
-        }
-
-        .tab-content.active {
-            display: block;
-        }
-
-        .charts-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-            gap: 24px;
-        }
-
-        .chart-container {
-            background: #1f2937;
-            border: 1px solid #374151;
-            border-radius: 8px;
-            padding: 24px;
-            position: relative;
-        }
-
-        .chart-title {
-            text-align: center;
-            font-weight: 500;
-            color: #ffffff;
-            margin-bottom: 20px;
-            font-size: 1rem;
-        }
-
-        .chart-canvas {
-            width: 100% !important;
-            height: 300px !important;
-        }
-
-        /* High Impact Routes Styles */
-        .high-impact-controls {
-            display: flex;
-            gap: 16px;
-            align-items: center;
-            margin-bottom: 24px;
-            flex-wrap: wrap;
-        }
-
-        .routes-table {
-            width: 100%;
-            border-collapse: collapse;
-            background: #1f2937;
-            border-radius: 8px;
-            overflow: hidden;
-        }
-
-        .routes-table th {
-            background: #374151;
-            color: #ffffff;
-            font-weight: 500;
-            padding: 16px 12px;
-            text-align: left;
-            font-size: 0.875rem;
-            border-bottom: 1px solid #4b5563;
-        }
-
-        .routes-table td {
-            padding: 12px;
-            border-bottom: 1px solid #374151;
-            color: #9ca3af;
-            font-size: 0.875rem;
-        }
-
-        .routes-table tr:hover {
-            background: #374151;
-        }
-
-        .route-rank {
-            color: #ffffff;
-            font-weight: 600;
-            font-size: 1rem;
-        }
-
-        .route-name {
-            color: #ffffff;
-            font-weight: 500;
-        }
-
-        .volume-cell {
-            color: #34d399;
-            font-weight: 600;
-        }
-
-        .revenue-cell {
-            color: #60a5fa;
-            font-weight: 600;
-        }
-
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 48px;
-            color: #9ca3af;
-        }
-
-        .loading.show {
-            display: block;
-        }
-
-        .spinner {
-            border: 3px solid #1f2937;
-            border-top: 3px solid #ffffff;
-            border-radius: 50%;
-            width: 32px;
-            height: 32px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 16px;
-        }
-
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-
-        .message {
-            padding: 16px;
-            border-radius: 8px;
-            margin: 16px 0;
-            display: none;
-            font-size: 0.875rem;
-        }
-
-        .error {
-            background: #1f1416;
-            color: #f87171;
-            border: 1px solid #374151;
-        }
-
-        .success {
-            background: #14221f;
-            color: #34d399;
-            border: 1px solid #374151;
-        }
-
-        .info {
-            background: #1e1f36;
-            color: #60a5fa;
-            border: 1px solid #374151;
-        }
-
-        .upload-status {
-            margin-top: 16px;
-            font-size: 0.875rem;
-        }
-
-        .no-data {
-            text-align: center;
-            padding: 48px;
-            color: #6b7280;
-        }
-
-        @media (max-width: 768px) {
-            .container {
-                padding: 16px;
-            }
-            
-            .charts-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .filter-controls {
-                flex-direction: column;
-                align-items: stretch;
-            }
-            
-            .tab-headers {
-                flex-direction: column;
-            }
-            
-            .selection-info {
-                grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-            }
-
-            .high-impact-controls {
-                flex-direction: column;
-                align-items: stretch;
-            }
-
-            .routes-table {
-                font-size: 0.75rem;
-            }
-
-            .routes-table th,
-            .routes-table td {
-                padding: 8px 6px;
-            }
-        }
-
-        /* Leaflet Dark Theme */
-        .leaflet-container {
-            background: #0a0a0a;
-        }
-
-        .leaflet-popup-content-wrapper {
-            background: #1f2937;
-            color: #ffffff;
-            border-radius: 8px;
-        }
-
-        .leaflet-popup-tip {
-            background: #1f2937;
-        }
-
-        .leaflet-control-zoom a {
-            background-color: #1f2937;
-            border-color: #374151;
-            color: #ffffff;
-        }
-
-        .leaflet-control-zoom a:hover {
-            background-color: #374151;
-        }
-
-        .leaflet-control-attribution {
-            background: rgba(31, 41, 55, 0.8);
-            color: #9ca3af;
-        }
-
-        .leaflet-control-attribution a {
-            color: #60a5fa;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>NYC Taxi Analytics Dashboard</h1>
-            <p class="subtitle">Analyze real-time taxi trip data with interactive visualizations</p>
-        </div>
-
-        <div class="upload-section">
-            <div class="upload-title">Upload Taxi Zones Shapefile</div>
-            <div class="upload-description">Upload a ZIP file containing the taxi zones shapefile (.shp, .shx, .dbf, .prj files)</div>
-            <div class="file-upload-container">
-                <input type="file" id="shapefileInput" class="file-upload-input" accept=".zip" />
-                <button class="file-upload-button">
-                    <span>Choose File</span>
-                </button>
-            </div>
-            <div class="upload-status" id="uploadStatus"></div>
-        </div>
-
-        <div class="controls">
-            <h2>Route Analysis</h2>
-            <div class="filter-controls">
-                <div class="filter-group">
-                    <label for="dayType">Day Type</label>
-                    <select id="dayType">
-                        <option value="all">All Days</option>
-                        <option value="weekday">Weekdays</option>
-                        <option value="weekend">Weekends</option>
-                    </select>
-                </div>
-                <button class="analyze-btn" id="analyzeBtn" disabled>
-                    Analyze Route
-                </button>
-            </div>
-            
-            <div class="message error" id="errorMsg"></div>
-            <div class="message success" id="successMsg"></div>
-            <div class="message info" id="infoMsg"></div>
-        </div>
-
-        <div class="map-container">
-            <h3>Select Pickup and Dropoff Zones</h3>
-            <div id="map"></div>
-            <div class="selection-info">
-                <div class="info-card">
-                    <h3>Pickup Zone</h3>
-                    <div class="value" id="pickupZone">Select on map</div>
-                </div>
-                <div class="info-card">
-                    <h3>Dropoff Zone</h3>
-                    <div class="value" id="dropoffZone">Select on map</div>
-                </div>
-                <div class="info-card">
-                    <h3>Total Trips</h3>
-                    <div class="value" id="totalTrips">—</div>
-                </div>
-                <div class="info-card">
-                    <h3>Avg Duration</h3>
-                    <div class="value" id="avgDuration">—</div>
-                </div>
-                <div class="info-card">
-                    <h3>Avg Price/Mile</h3>
-                    <div class="value" id="avgPriceMile">—</div>
-                </div>
-                <div class="info-card">
-                    <h3>Avg Total Fare</h3>
-                    <div class="value" id="avgTotalFare">—</div>
-                </div>
-                <div class="info-card">
-                    <h3>Avg Wait Time</h3>
-                    <div class="value" id="avgWaitTime">—</div>
-                </div>
-            </div>
-        </div>
-
-        <div class="loading" id="loadingIndicator">
-            <div class="spinner"></div>
-            <h3>Processing data...</h3>
-            <p>Analyzing trip patterns between selected zones</p>
-        </div>
-
-        <div class="tabs" id="chartsTabs" style="display: none;">
-            <div class="tab-headers">
-                <button class="tab-header active" data-tab="hourly">Hourly Analysis</button>
-                <button class="tab-header" data-tab="daily">Daily Analysis</button>
-                <button class="tab-header" data-tab="monthly">Monthly Analysis</button>
-               <button class="tab-header" data-tab="high-impact-combined">High Impact by Day & Hour</button>
-                <button class="tab-header" data-tab="high-impact-month">High Impact Routes by Month</button>
-            </div>
-
-            <div class="tab-content active" id="hourly">
-                <div class="charts-grid">
-                    <div class="chart-container">
-                        <div class="chart-title">Trip Volume by Hour</div>
-                        <canvas class="chart-canvas" id="hourlyVolumeChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Price per Mile by Hour</div>
-                        <canvas class="chart-canvas" id="hourlyPriceChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Total Price by Hour (2024)</div>
-                        <canvas class="chart-canvas" id="hourlyTotalFareChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Average Duration by Hour</div>
-                        <canvas class="chart-canvas" id="hourlyDurationChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Average Wait Time by Hour</div>
-                        <canvas class="chart-canvas" id="hourlyWaitChart"></canvas>
-                    </div>
-                </div>
-            </div>
-
-            <div class="tab-content" id="daily">
-                <div class="charts-grid">
-                    <div class="chart-container">
-                        <div class="chart-title">Trip Volume by Day of Week</div>
-                        <canvas class="chart-canvas" id="dailyVolumeChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Price per Mile by Day of Week</div>
-                        <canvas class="chart-canvas" id="dailyPriceChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Total Price by Day (2024)</div>
-                        <canvas class="chart-canvas" id="dailyTotalFareChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Average Duration by Day of Week</div>
-                        <canvas class="chart-canvas" id="dailyDurationChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Average Wait Time by Day of Week</div>
-                        <canvas class="chart-canvas" id="dailyWaitChart"></canvas>
-                    </div>
-                </div>
-            </div>
-
-            <div class="tab-content" id="monthly">
-                <div class="charts-grid">
-                    <div class="chart-container">
-                        <div class="chart-title">Trip Volume by Month (2024)</div>
-                        <canvas class="chart-canvas" id="monthlyVolumeChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Price per Mile by Month (2024)</div>
-                        <canvas class="chart-canvas" id="monthlyPriceChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Total Price by Month (2024)</div>
-                        <canvas class="chart-canvas" id="monthlyTotalFareChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Average Duration by Month (2024)</div>
-                        <canvas class="chart-canvas" id="monthlyDurationChart"></canvas>
-                    </div>
-                    <div class="chart-container">
-                        <div class="chart-title">Average Wait Time by Month (2024)</div>
-                        <canvas class="chart-canvas" id="monthlyWaitChart"></canvas>
-                    </div>
-                </div>
-            </div>
-
-            <!-- NEW HIGH IMPACT ROUTES TABS -->
-            <div class="tab-content" id="high-impact-combined">
-                <div class="high-impact-controls">
-                    <div class="filter-group">
-                        <label for="dayHourDaySelect">Select Day</label>
-                        <select id="dayHourDaySelect">
-                            <option value="">Choose a day...</option>
-                            <option value="0">Monday</option>
-                            <option value="1">Tuesday</option>
-                            <option value="2">Wednesday</option>
-                            <option value="3">Thursday</option>
-                            <option value="4">Friday</option>
-                            <option value="5">Saturday</option>
-                            <option value="6">Sunday</option>
-                        </select>
-                    </div>
-                    <div class="filter-group">
-                        <label for="dayHourHourSelect">Select Hour</label>
-                        <select id="dayHourHourSelect">
-                            <option value="">Choose an hour...</option>
-                            <option value="0">12:00 AM</option>
-                            <option value="1">1:00 AM</option>
-                            <option value="2">2:00 AM</option>
-                            <option value="3">3:00 AM</option>
-                            <option value="4">4:00 AM</option>
-                            <option value="5">5:00 AM</option>
-                            <option value="6">6:00 AM</option>
-                            <option value="7">7:00 AM</option>
-                            <option value="8">8:00 AM</option>
-                            <option value="9">9:00 AM</option>
-                            <option value="10">10:00 AM</option>
-                            <option value="11">11:00 AM</option>
-                            <option value="12">12:00 PM</option>
-                            <option value="13">1:00 PM</option>
-                            <option value="14">2:00 PM</option>
-                            <option value="15">3:00 PM</option>
-                            <option value="16">4:00 PM</option>
-                            <option value="17">5:00 PM</option>
-                            <option value="18">6:00 PM</option>
-                            <option value="19">7:00 PM</option>
-                            <option value="20">8:00 PM</option>
-                            <option value="21">9:00 PM</option>
-                            <option value="22">10:00 PM</option>
-                            <option value="23">11:00 PM</option>
-                        </select>
-                    </div>
-                    <button class="analyze-btn" onclick="analyzeHighImpactByDayHour()">Get Top Routes</button>
-                </div>
-
-                <div id="highImpactCombinedHeader" style="margin-bottom: 16px; color:#9ca3af;"></div>
-
-                <div id="highImpactCombinedVolume"></div>
-                <div style="height:16px;"></div>
-                <div id="highImpactCombinedPrice"></div>
-            </div>
-
-            <div class="tab-content" id="high-impact-month">
-            <div class="high-impact-controls">
-                <div class="filter-group">
-                <label for="monthSelect">Select Month</label>
-                <select id="monthSelect">
-                    <option value="">Choose a month...</option>
-                    <option value="1">January 2024</option>
-                    <option value="2">February 2024</option>
-                    <option value="3">March 2024</option>
-                    <option value="4">April 2024</option>
-                    <option value="5">May 2024</option>
-                    <option value="6">June 2024</option>
-                    <option value="7">July 2024</option>
-                    <option value="8">August 2024</option>
-                    <option value="9">September 2024</option>
-                    <option value="10">October 2024</option>
-                    <option value="11">November 2024</option>
-                    <option value="12">December 2024</option>
-                </select>
-                </div>
-                <button class="analyze-btn" onclick="analyzeHighImpactByMonth()">Get Top Routes</button>
-            </div>
-
-            <div id="highImpactMonthHeader" style="margin-bottom: 16px; color:#9ca3af;"></div>
-            <div id="highImpactMonthVolume"></div>
-            <div style="height:16px;"></div>
-            <div id="highImpactMonthPrice"></div>
-            </div>
-
-    <script>
-        // Global variables
-        let map;
-        let zonesLayer;
-        let pickupZoneId = null;
-        let dropoffZoneId = null;
-        let charts = {};
-
-        // Initialize the application
-        async function initApp() {
-            try {
-                showMessage('Initializing dashboard...', 'info');
-                initMap();
-                setupEventListeners();
-                await checkHealth();
-                await loadTaxiZones();
-                showMessage('Dashboard ready! Upload a shapefile or select zones on the map.', 'success');
-            } catch (error) {
-                console.error('Initialization error:', error);
-                showMessage('Error initializing dashboard: ' + error.message, 'error');
-            }
-        }
-
-        // Initialize map
-        function initMap() {
-            map = L.map('map').setView([40.7589, -73.9851], 11);
-            
-            // Dark tile layer
-            L.tileLayer('https://{s}.basemaps.cartocdn.com/dark_all/{z}/{x}/{y}{r}.png', {
-                attribution: '© OpenStreetMap contributors, © CARTO'
-            }).addTo(map);
-        }
-
-        // Load taxi zones from API
-        async function loadTaxiZones() {
-            try {
-                const response = await fetch('/api/taxi-zones');
-                const zonesData = await response.json();
-                
-                if (zonesData.features && zonesData.features.length > 0) {
-                    displayZones(zonesData);
-                    showMessage(`Loaded ${zonesData.features.length} taxi zones`, 'success');
-                } else {
-                    showMessage('No zones loaded. Please upload a shapefile.', 'info');
-                }
-            } catch (error) {
-                console.error('Error loading taxi zones:', error);
-                showMessage('Error loading zones: ' + error.message, 'error');
-            }
-        }
-
-        // Display zones on map
-        function displayZones(geojsonData) {
-            if (zonesLayer) {
-                map.removeLayer(zonesLayer);
-            }
-
-            zonesLayer = L.geoJSON(geojsonData, {
-                style: {
-                    fillColor: '#ffffff',
-                    weight: 1,
-                    opacity: 0.8,
-                    color: '#ffffff',
-                    fillOpacity: 0.1
-                },
-                pointToLayer: function(feature, latlng) {
-                    return L.circleMarker(latlng, {
-                        radius: 8,
-                        fillColor: '#ffffff',
-                        color: '#ffffff',
-                        weight: 2,
-                        opacity: 0.8,
-                        fillOpacity: 0.3
-                    });
-                },
-                onEachFeature: function(feature, layer) {
-                    // Get zone ID from properties (try common field names)
-                    const zoneId = feature.properties.LocationID || 
-                                  feature.properties.OBJECTID || 
-                                  feature.properties.zone_id || 
-                                  feature.properties.id ||
-                                  feature.properties.Zone;
-                    
-                    const zoneName = feature.properties.zone || 
-                                    feature.properties.Zone || 
-                                    feature.properties.borough || 
-                                    feature.properties.name ||
-                                    `Zone ${zoneId}`;
-
-                    // Bind popup
-                    layer.bindPopup(`<b>Zone ${zoneId}</b><br>${zoneName}`);
-                    
-                    // Hover effects
-                    layer.on('mouseover', function(e) {
-                        if (layer.setStyle) {
-                            layer.setStyle({
-                                weight: 2,
-                                fillOpacity: 0.3
-                            });
-                        } else {
-                            // Handle circle markers
-                            layer.setStyle({
-                                radius: 10,
-                                fillOpacity: 0.6
-                            });
-                        }
-                        
-                        // Show tooltip
-                        layer.openPopup();
-                    });
-                    
-                    layer.on('mouseout', function(e) {
-                        if (layer.setStyle) {
-                            layer.setStyle({
-                                weight: 1,
-                                fillOpacity: 0.1
-                            });
-                        } else {
-                            // Handle circle markers
-                            layer.setStyle({
-                                radius: 8,
-                                fillOpacity: 0.3
-                            });
-                        }
-                        
-                        layer.closePopup();
-                    });
-                    
-                    // Click handler
-                    layer.on('click', function(e) {
-                        if (zoneId) {
-                            selectZone(parseInt(zoneId), zoneName);
-                        }
-                    });
-                }
-            }).addTo(map);
-
-            // Fit map to zones
-            map.fitBounds(zonesLayer.getBounds());
-        }
-
-        // Upload shapefile
-        async function uploadShapefile(file) {
-            const formData = new FormData();
-            formData.append('shapefile', file);
-
-            try {
-                showMessage('Uploading and processing shapefile...', 'info');
-                
-                const response = await fetch('/upload-zones', {
-                    method: 'POST',
-                    body: formData
-                });
+# Dashboard page shell, kept in memory so it can be served precompressed
+with open(os.path.join(app.static_folder, 'index.html'), encoding='utf-8') as f:
+    DASHBOARD_HTML = f.read()
 
-                const result = await response.json();
-                
-                if (response.ok) {
-                    showMessage(`Shapefile processed successfully! Loaded ${result.zones_count} zones.`, 'success');
-                    await loadTaxiZones();
-                } else {
-                    throw new Error(result.error);
-                }
-            } catch (error) {
-                showMessage('Upload failed: ' + error.message, 'error');
-            }
-        }
-
-        // Setup event listeners
-        function setupEventListeners() {
-            document.getElementById('analyzeBtn').addEventListener('click', analyzeRoute);
-            
-            // File upload
-            document.getElementById('shapefileInput').addEventListener('change', function(e) {
-                const file = e.target.files[0];
-                if (file) {
-                    document.getElementById('uploadStatus').textContent = `Selected: ${file.name}`;
-                    uploadShapefile(file);
-                }
-            });
-            
-            // Tab switching
-            document.querySelectorAll('.tab-header').forEach(tab => {
-                tab.addEventListener('click', function() {
-                    switchTab(this.dataset.tab);
-                });
-            });
-        }
-
-        // Select zone function
-        function selectZone(zoneId, zoneName) {
-            if (!pickupZoneId) {
-                pickupZoneId = zoneId;
-                document.getElementById('pickupZone').textContent = `${zoneId}: ${zoneName}`;
-                showMessage(`Pickup zone selected: ${zoneName}`, 'success');
-            } else if (!dropoffZoneId) {
-                // allow same zone for dropoff
-                dropoffZoneId = zoneId;
-                document.getElementById('dropoffZone').textContent = `${zoneId}: ${zoneName}`;
-                document.getElementById('analyzeBtn').disabled = false;
-                const same = (pickupZoneId === dropoffZoneId) ? ' (same as pickup)' : '';
-                showMessage(`Dropoff zone selected: ${zoneName}${same}. Click "Analyze Route" to process data.`, 'success');
-            } else if (zoneId === pickupZoneId && zoneId === dropoffZoneId) {
-            // both already same—nudge user to analyze or reselect
-            showMessage('Pickup and dropoff are the same. Click Analyze Route or pick new zones.', 'info');
-            } else {
-                // Reset and start over
-                pickupZoneId = zoneId;
-                dropoffZoneId = null;
-                document.getElementById('pickupZone').textContent = `${zoneId}: ${zoneName}`;
-                document.getElementById('dropoffZone').textContent = 'Select on map';
-                document.getElementById('analyzeBtn').disabled = true;
-                clearSummaryStats();
-                showMessage(`New pickup zone selected: ${zoneName}. Select a dropoff zone.`, 'success');
-            }
-        }
-
-        // Switch tabs
-        function switchTab(tabName) {
-            document.querySelectorAll('.tab-header').forEach(t => t.classList.remove('active'));
-            document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
-            
-            document.querySelector(`[data-tab="${tabName}"]`).classList.add('active');
-            document.getElementById(tabName).classList.add('active');
-        }
-
-        // Check backend health and update UI accordingly
-        async function checkHealth() {
-            try {
-                const response = await fetch('/api/health');
-                const health = await response.json();
-                if (health.status === 'healthy') {
-                    showMessage(`Connected to database with ${health.total_records.toLocaleString()} records`, 'success');
-                    
-                    // Hide upload section if geopandas is not available
-                    if (!health.geopandas_available) {
-                        document.querySelector('.upload-section').style.display = 'none';
-                        showMessage('Shapefile upload disabled - using default zones. To enable upload, install: pip install geopandas', 'info');
-                        // Load some default zones for demo
-                        loadDefaultZones();
-                    }
-                } else {
-                    throw new Error('Backend not ready');
-                }
-            } catch (error) {
-                showMessage('Backend connection failed: ' + error.message, 'error');
-                throw error;
-            }
-        }
-
-        // Load default zones if geopandas is not available
-        function loadDefaultZones() {
-            const defaultZones = {
-                "type": "FeatureCollection",
-                "features": [
-                    {
-                        "type": "Feature",
-                        "properties": {
-                            "LocationID": 1,
-                            "zone": "Newark Airport"
-                        },
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [-74.1745, 40.6895]
-                        }
-                    },
-                    {
-                        "type": "Feature", 
-                        "properties": {
-                            "LocationID": 48,
-                            "zone": "Clinton East"
-                        },
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [-73.9924, 40.7614]
-                        }
-                    },
-                    {
-                        "type": "Feature",
-                        "properties": {
-                            "LocationID": 127,
-                            "zone": "JFK Airport"
-                        },
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [-73.7781, 40.6413]
-                        }
-                    },
-                    {
-                        "type": "Feature",
-                        "properties": {
-                            "LocationID": 133,
-                            "zone": "LaGuardia Airport"
-                        },
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [-73.8740, 40.7769]
-                        }
-                    },
-                    {
-                        "type": "Feature",
-                        "properties": {
-                            "LocationID": 230,
-                            "zone": "Upper East Side South"
-                        },
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [-73.9565, 40.7690]
-                        }
-                    },
-                    {
-                        "type": "Feature",
-                        "properties": {
-                            "LocationID": 261,
-                            "zone": "World Trade Center"
-                        },
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [-74.0125, 40.7116]
-                        }
-                    }
-                ]
-            };
-            
-            displayZones(defaultZones);
-            showMessage('Loaded default zones for demo. Upload shapefile for full zone coverage.', 'info');
-        }
-
-        // Analyze route with REAL data
-        async function analyzeRoute() {
-            if (!pickupZoneId || !dropoffZoneId) {
-                showMessage('Please select both pickup and dropoff zones', 'error');
-                return;
-            }
-
-            document.getElementById('loadingIndicator').classList.add('show');
-            document.getElementById('chartsTabs').style.display = 'none';
-
-            try {
-                const dayType = document.getElementById('dayType').value;
-                
-                showMessage('Querying database...', 'info');
-                
-                const response = await fetch(`/api/route-analysis?pickup=${pickupZoneId}&dropoff=${dropoffZoneId}&day_type=${dayType}`);
-                
-                if (!response.ok) {
-                    const errorData = await response.json();
-                    throw new Error(errorData.error || 'Failed to analyze route');
-                }
-                
-                const routeData = await response.json();
-                
-                // Update summary statistics
-                updateSummaryStats(routeData.summary);
-                
-                // Create charts with REAL data
-                createHourlyCharts(routeData.hourly);
-                createDailyCharts(routeData.daily);
-                createMonthlyCharts(routeData.monthly);
-                
-                document.getElementById('loadingIndicator').classList.remove('show');
-                document.getElementById('chartsTabs').style.display = 'block';
-                
-                showMessage(`Analysis complete! Processed ${routeData.summary.total_trips.toLocaleString()} trips.`, 'success');
-                
-            } catch (error) {
-                console.error('Analysis error:', error);
-                document.getElementById('loadingIndicator').classList.remove('show');
-                
-                if (error.message.includes('No trips found')) {
-                    showMessage(`${error.message}. Try selecting different zones or changing the day type filter.`, 'error');
-                } else {
-                    showMessage('Error processing data: ' + error.message, 'error');
-                }
-            }
-        }
-
-        // NEW HIGH IMPACT ROUTES FUNCTIONS
-        async function analyzeHighImpactByDayHour() {
-            const day = document.getElementById('dayHourDaySelect').value;
-            const hour = document.getElementById('dayHourHourSelect').value;
-
-            if ((day === '' || day === null) || (hour === '' || hour === null)) {
-                showMessage('Please select both a day and an hour', 'error');
-                return;
-            }
-
-            const header = document.getElementById('highImpactCombinedHeader');
-            const volDiv = document.getElementById('highImpactCombinedVolume');
-            const priceDiv = document.getElementById('highImpactCombinedPrice');
-
-            const loadingHTML = '<div class="loading show"><div class="spinner"></div><p>Loading top routes...</p></div>';
-            volDiv.innerHTML = loadingHTML;
-            priceDiv.innerHTML = loadingHTML;
-            header.textContent = '';
-
-            try {
-                const resp = await fetch(`/api/high-impact-routes?day=${day}&hour=${hour}`);
-                const data = await resp.json();
-                if (!resp.ok) throw new Error(data.error || 'Failed to load routes');
-
-                header.textContent = `Top routes for ${data.day_name} at ${String(data.hour).padStart(2,'0')}:00`;
-
-                // Table 1: Top by Volume
-                volDiv.innerHTML = renderHighImpactTable(
-                    data.top_by_volume,
-                    'Top 10 Routes by Volume',
-                    true // show volume emphasis
-                );
-
-                // Table 2: Top by Price (Avg Fare)
-                priceDiv.innerHTML = renderHighImpactTable(
-                    data.top_by_price,
-                    'Top 10 Routes by Price (Avg Fare)',
-                    false // show price emphasis
-                );
-
-                showMessage(`Loaded ${data.top_by_volume.length} by volume and ${data.top_by_price.length} by price.`, 'success');
-            } catch (e) {
-                volDiv.innerHTML = `<div class="no-data">${e.message}</div>`;
-                priceDiv.innerHTML = `<div class="no-data">${e.message}</div>`;
-                showMessage('Error loading high impact routes: ' + e.message, 'error');
-            }
-        }
-
-        // Reuse your existing table style; render two different emphases.
-        function renderHighImpactTable(routes, title, emphasizeVolume) {
-            if (!routes || routes.length === 0) {
-                return '<div class="no-data">No routes found for the selected day & hour.</div>';
-            }
-
-            let html = `
-                <div style="margin-bottom: 12px;">
-                    <h3 style="color:#ffffff; margin-bottom:6px;">${title}</h3>
-                    <p style="color:#9ca3af; font-size:0.875rem;">Ranked ${emphasizeVolume ? 'by trip volume' : 'by average fare'}</p>
-                </div>
-                <table class="routes-table">
-                    <thead>
-                        <tr>
-                            <th>Rank</th>
-                            <th style="min-width:250px;">Route</th>
-                            <th>Volume</th>
-                            <th>Total Revenue</th>
-                            <th>Avg Fare</th>
-                            <th>Avg Duration</th>
-                            <th>Avg Distance</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            `;
-
-            routes.forEach((r, i) => {
-                html += `
-                    <tr>
-                        <td class="route-rank">#${i + 1}</td>
-                        <td class="route-name" style="max-width:300px; word-wrap:break-word;">${r.route_name || (r.pickup_name + ' → ' + r.dropoff_name)}</td>
-                        <td class="volume-cell">${(r.volume || 0).toLocaleString()}</td>
-                        <td class="revenue-cell">${(r.total_revenue || 0).toLocaleString(undefined, {minimumFractionDigits:0, maximumFractionDigits:0})}</td>
-                        <td>${(r.avg_total_fare || 0).toFixed(2)}</td>
-                        <td>${(r.avg_duration || 0).toFixed(1)} min</td>
-                        <td>${(r.avg_distance || 0).toFixed(1)} mi</td>
-                    </tr>
-                `;
-            });
-
-            html += `</tbody></table>`;
-            return html;
-        }
-
-        async function analyzeHighImpactByMonth() {
-            const month = document.getElementById('monthSelect').value;
-            if (!month) {
-                showMessage('Please select a month', 'error');
-                return;
-            }
-
-            const header = document.getElementById('highImpactMonthHeader');
-            const volDiv = document.getElementById('highImpactMonthVolume');
-            const priceDiv = document.getElementById('highImpactMonthPrice');
-
-            const loadingHTML = '<div class="loading show"><div class="spinner"></div><p>Loading top routes...</p></div>';
-            header.textContent = '';
-            volDiv.innerHTML = loadingHTML;
-            priceDiv.innerHTML = loadingHTML;
-
-            try {
-                const resp = await fetch(`/api/high-impact-routes-by-month?month=${month}`);
-                const data = await resp.json();
-                if (!resp.ok) throw new Error(data.error || 'Failed to load routes');
-
-                header.textContent = `Top routes for ${data.month_name}`;
-
-                // Table 1: Top by Volume
-                volDiv.innerHTML = renderHighImpactTable(
-                data.top_by_volume || [],
-                'Top 10 Routes by Volume (Month)',
-                true // emphasize volume
-                );
-
-                // Table 2: Top by Total Price (Revenue)
-                priceDiv.innerHTML = renderHighImpactTable(
-                data.top_by_price || [],
-                'Top 10 Routes by Total Price (Revenue) (Month)',
-                false // emphasize price
-                );
-
-                showMessage(`Loaded ${ (data.top_by_volume||[]).length } by volume and ${ (data.top_by_price||[]).length } by price.`, 'success');
-            } catch (error) {
-                volDiv.innerHTML = `<div class="no-data">${error.message}</div>`;
-                priceDiv.innerHTML = `<div class="no-data">${error.message}</div>`;
-                showMessage('Error loading high impact routes: ' + error.message, 'error');
-            }
-        }
-
-
-        function displayHighImpactResults(container, data, type) {
-            if (!data.routes || data.routes.length === 0) {
-                container.innerHTML = '<div class="no-data">No routes found for the selected period.</div>';
-                return;
-            }
-
-            const timeLabel = data.time_label || data.day_name || data.month_name;
-            
-            let html = `
-                <div style="margin-bottom: 24px;">
-                    <h3 style="color: #ffffff; margin-bottom: 8px;">Top 10 Routes for ${timeLabel}</h3>
-                    <p style="color: #9ca3af; font-size: 0.875rem;">Ranked by trip volume and total revenue</p>
-                </div>
-                <table class="routes-table">
-                    <thead>
-                        <tr>
-                            <th>Rank</th>
-                            <th style="min-width: 250px;">Route</th>
-                            <th>Volume</th>
-                            <th>Total Revenue</th>
-                            <th>Avg Fare</th>
-                            <th>Avg Duration</th>
-                            <th>Avg Distance</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            `;
-
-            data.routes.forEach((route, index) => {
-                // Use the actual zone names from the API response
-                const routeName = route.route_name || `${route.pickup_name} → ${route.dropoff_name}`;
-                
-                html += `
-                    <tr>
-                        <td class="route-rank">#${index + 1}</td>
-                        <td class="route-name" style="max-width: 300px; word-wrap: break-word;">${routeName}</td>
-                        <td class="volume-cell">${route.volume.toLocaleString()}</td>
-                        <td class="revenue-cell">${route.total_revenue.toLocaleString(undefined, {minimumFractionDigits: 0, maximumFractionDigits: 0})}</td>
-                        <td>${route.avg_total_fare.toFixed(2)}</td>
-                        <td>${route.avg_duration.toFixed(1)} min</td>
-                        <td>${route.avg_distance.toFixed(1)} mi</td>
-                    </tr>
-                `;
-            });
-
-            html += `
-                    </tbody>
-                </table>
-                <div style="margin-top: 16px; font-size: 0.75rem; color: #6b7280;">
-                    * Routes are ranked by trip volume, then by total revenue. Zone names are loaded from uploaded shapefile or default NYC zones.
-                </div>
-            `;
-
-            container.innerHTML = html;
-        }
-
-        // Update summary statistics INCLUDING total fare
-        function updateSummaryStats(summary) {
-            document.getElementById('totalTrips').textContent = summary.total_trips.toLocaleString();
-            document.getElementById('avgDuration').textContent = summary.avg_duration.toFixed(1) + ' min';
-            document.getElementById('avgPriceMile').textContent = '$' + summary.avg_price_mile.toFixed(2);
-            document.getElementById('avgTotalFare').textContent = '$' + summary.avg_total_fare.toFixed(2);
-            document.getElementById('avgWaitTime').textContent = summary.avg_wait_time.toFixed(1) + ' min';
-        }
-
-        // Clear summary statistics
-        function clearSummaryStats() {
-            document.getElementById('totalTrips').textContent = '—';
-            document.getElementById('avgDuration').textContent = '—';
-            document.getElementById('avgPriceMile').textContent = '—';
-            document.getElementById('avgTotalFare').textContent = '—';
-            document.getElementById('avgWaitTime').textContent = '—';
-        }
-
-        // Create hourly charts INCLUDING total fare chart
-        function createHourlyCharts(data) {
-            const hourlyData = [];
-            for (let hour = 0; hour < 24; hour++) {
-                const hourData = data.find(d => d.hour === hour);
-                if (hourData) {
-                    hourlyData.push(hourData);
-                } else {
-                    hourlyData.push({
-                        hour: hour,
-                        volume: 0,
-                        price_per_mile: 0,
-                        total_fare_amount: 0,
-                        avg_duration: 0,
-                        avg_wait_time: 0
-                    });
-                }
-            }
-
-            const dataWithValues = data.filter(d => d.volume > 0);
-            const hourlyAvgs = {
-                volume: dataWithValues.length > 0 ? dataWithValues.reduce((sum, d) => sum + d.volume, 0) / dataWithValues.length : 0,
-                price_per_mile: dataWithValues.length > 0 ? dataWithValues.reduce((sum, d) => sum + d.price_per_mile, 0) / dataWithValues.length : 0,
-                total_fare_amount: dataWithValues.length > 0 ? dataWithValues.reduce((sum, d) => sum + d.total_fare_amount, 0) / dataWithValues.length : 0,
-                avg_duration: dataWithValues.length > 0 ? dataWithValues.reduce((sum, d) => sum + d.avg_duration, 0) / dataWithValues.length : 0,
-                avg_wait_time: dataWithValues.length > 0 ? dataWithValues.reduce((sum, d) => sum + d.avg_wait_time, 0) / dataWithValues.length : 0
-            };
-
-            createLineChart('hourlyVolumeChart', {
-                labels: hourlyData.map(d => d.hour + ':00'),
-                datasets: [
-                    {
-                        label: 'Trip Volume',
-                        data: hourlyData.map(d => d.volume),
-                        borderColor: '#ffffff',
-                        backgroundColor: 'rgba(255, 255, 255, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Daily Average',
-                        data: new Array(24).fill(hourlyAvgs.volume),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Trip Count');
-
-            createLineChart('hourlyPriceChart', {
-                labels: hourlyData.map(d => d.hour + ':00'),
-                datasets: [
-                    {
-                        label: 'Price per Mile',
-                        data: hourlyData.map(d => d.price_per_mile),
-                        borderColor: '#34d399',
-                        backgroundColor: 'rgba(52, 211, 153, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Daily Average',
-                        data: new Array(24).fill(hourlyAvgs.price_per_mile),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Price ($)');
-
-            // NEW: Total Fare Amount Chart for Hourly
-            createLineChart('hourlyTotalFareChart', {
-                labels: hourlyData.map(d => d.hour + ':00'),
-                datasets: [
-                    {
-                        label: 'Actual Total Price',
-                        data: hourlyData.map(d => d.total_fare_amount),
-                        borderColor: '#06b6d4',
-                        backgroundColor: 'rgba(6, 182, 212, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Yearly Average',
-                        data: new Array(24).fill(hourlyAvgs.total_fare_amount),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Price ($)', {
-                tooltipCallback: function(context) {
-                    const hour = context.label;
-                    const price = context.parsed.y.toFixed(2);
-                    const yearlyAvg = hourlyAvgs.total_fare_amount.toFixed(2);
-                    return [
-                        `Time: ${hour}`,
-                        `Total Price: $${price}`,
-                        `Yearly Average: $${yearlyAvg}`
-                    ];
-                }
-            });
-
-            createLineChart('hourlyDurationChart', {
-                labels: hourlyData.map(d => d.hour + ':00'),
-                datasets: [
-                    {
-                        label: 'Duration',
-                        data: hourlyData.map(d => d.avg_duration),
-                        borderColor: '#f59e0b',
-                        backgroundColor: 'rgba(245, 158, 11, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Daily Average',
-                        data: new Array(24).fill(hourlyAvgs.avg_duration),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Duration (minutes)');
-
-            createLineChart('hourlyWaitChart', {
-                labels: hourlyData.map(d => d.hour + ':00'),
-                datasets: [
-                    {
-                        label: 'Wait Time',
-                        data: hourlyData.map(d => d.avg_wait_time),
-                        borderColor: '#ec4899',
-                        backgroundColor: 'rgba(236, 72, 153, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Daily Average',
-                        data: new Array(24).fill(hourlyAvgs.avg_wait_time),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Wait Time (minutes)');
-        }
-
-        // Create daily charts INCLUDING total fare chart
-        function createDailyCharts(data) {
-            const dailyAvgs = {
-                volume: data.length > 0 ? data.reduce((sum, d) => sum + d.volume, 0) / data.length : 0,
-                price_per_mile: data.length > 0 ? data.reduce((sum, d) => sum + d.price_per_mile, 0) / data.length : 0,
-                total_fare_amount: data.length > 0 ? data.reduce((sum, d) => sum + d.total_fare_amount, 0) / data.length : 0,
-                avg_duration: data.length > 0 ? data.reduce((sum, d) => sum + d.avg_duration, 0) / data.length : 0,
-                avg_wait_time: data.length > 0 ? data.reduce((sum, d) => sum + d.avg_wait_time, 0) / data.length : 0
-            };
-
-            createLineChart('dailyVolumeChart', {
-                labels: data.map(d => d.day),
-                datasets: [
-                    {
-                        label: 'Trip Volume',
-                        data: data.map(d => d.volume),
-                        borderColor: '#ffffff',
-                        backgroundColor: 'rgba(255, 255, 255, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Weekly Average',
-                        data: new Array(data.length).fill(dailyAvgs.volume),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Trip Count');
-
-            createLineChart('dailyPriceChart', {
-                labels: data.map(d => d.day),
-                datasets: [
-                    {
-                        label: 'Price per Mile',
-                        data: data.map(d => d.price_per_mile),
-                        borderColor: '#34d399',
-                        backgroundColor: 'rgba(52, 211, 153, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Weekly Average',
-                        data: new Array(data.length).fill(dailyAvgs.price_per_mile),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Price ($)');
-
-            // NEW: Total Fare Amount Chart for Daily
-            createLineChart('dailyTotalFareChart', {
-                labels: data.map(d => d.day),
-                datasets: [
-                    {
-                        label: 'Actual Total Price',
-                        data: data.map(d => d.total_fare_amount),
-                        borderColor: '#06b6d4',
-                        backgroundColor: 'rgba(6, 182, 212, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Yearly Average',
-                        data: new Array(data.length).fill(dailyAvgs.total_fare_amount),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Price ($)', {
-                tooltipCallback: function(context) {
-                    const day = context.label;
-                    const price = context.parsed.y.toFixed(2);
-                    const yearlyAvg = dailyAvgs.total_fare_amount.toFixed(2);
-                    return [
-                        `Day: ${day}`,
-                        `Total Price: $${price}`,
-                        `Yearly Average: $${yearlyAvg}`
-                    ];
-                }
-            });
-
-            createLineChart('dailyDurationChart', {
-                labels: data.map(d => d.day),
-                datasets: [
-                    {
-                        label: 'Duration',
-                        data: data.map(d => d.avg_duration),
-                        borderColor: '#f59e0b',
-                        backgroundColor: 'rgba(245, 158, 11, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Weekly Average',
-                        data: new Array(data.length).fill(dailyAvgs.avg_duration),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Duration (minutes)');
-
-            createLineChart('dailyWaitChart', {
-                labels: data.map(d => d.day),
-                datasets: [
-                    {
-                        label: 'Wait Time',
-                        data: data.map(d => d.avg_wait_time),
-                        borderColor: '#ec4899',
-                        backgroundColor: 'rgba(236, 72, 153, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Weekly Average',
-                        data: new Array(data.length).fill(dailyAvgs.avg_wait_time),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Wait Time (minutes)');
-        }
-
-        // Create monthly charts INCLUDING total fare chart
-        function createMonthlyCharts(data) {
-            const monthlyAvgs = {
-                volume: data.length > 0 ? data.reduce((sum, d) => sum + d.volume, 0) / data.length : 0,
-                price_per_mile: data.length > 0 ? data.reduce((sum, d) => sum + d.price_per_mile, 0) / data.length : 0,
-                total_fare_amount: data.length > 0 ? data.reduce((sum, d) => sum + d.total_fare_amount, 0) / data.length : 0,
-                avg_duration: data.length > 0 ? data.reduce((sum, d) => sum + d.avg_duration, 0) / data.length : 0,
-                avg_wait_time: data.length > 0 ? data.reduce((sum, d) => sum + d.avg_wait_time, 0) / data.length : 0
-            };
-
-            createLineChart('monthlyVolumeChart', {
-                labels: data.map(d => d.month_name),
-                datasets: [
-                    {
-                        label: 'Trip Volume',
-                        data: data.map(d => d.volume),
-                        borderColor: '#ffffff',
-                        backgroundColor: 'rgba(255, 255, 255, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Yearly Average',
-                        data: new Array(data.length).fill(monthlyAvgs.volume),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Trip Count');
-
-            createLineChart('monthlyPriceChart', {
-                labels: data.map(d => d.month_name),
-                datasets: [
-                    {
-                        label: 'Price per Mile',
-                        data: data.map(d => d.price_per_mile),
-                        borderColor: '#34d399',
-                        backgroundColor: 'rgba(52, 211, 153, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Yearly Average',
-                        data: new Array(data.length).fill(monthlyAvgs.price_per_mile),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Price ($)');
-
-            // NEW: Total Fare Amount Chart for Monthly
-            createLineChart('monthlyTotalFareChart', {
-                labels: data.map(d => d.month_name),
-                datasets: [
-                    {
-                        label: 'Actual Total Price',
-                        data: data.map(d => d.total_fare_amount),
-                        borderColor: '#06b6d4',
-                        backgroundColor: 'rgba(6, 182, 212, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Yearly Average',
-                        data: new Array(data.length).fill(monthlyAvgs.total_fare_amount),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Price ($)', {
-                tooltipCallback: function(context) {
-                    const month = context.label;
-                    const price = context.parsed.y.toFixed(2);
-                    const yearlyAvg = monthlyAvgs.total_fare_amount.toFixed(2);
-                    return [
-                        `Month: ${month}`,
-                        `Total Price: ${price}`,
-                        `Yearly Average: ${yearlyAvg}`
-                    ];
-                }
-            });
-
-            createLineChart('monthlyDurationChart', {
-                labels: data.map(d => d.month_name),
-                datasets: [
-                    {
-                        label: 'Duration',
-                        data: data.map(d => d.avg_duration),
-                        borderColor: '#f59e0b',
-                        backgroundColor: 'rgba(245, 158, 11, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Yearly Average',
-                        data: new Array(data.length).fill(monthlyAvgs.avg_duration),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Duration (minutes)');
-
-            createLineChart('monthlyWaitChart', {
-                labels: data.map(d => d.month_name),
-                datasets: [
-                    {
-                        label: 'Wait Time',
-                        data: data.map(d => d.avg_wait_time),
-                        borderColor: '#ec4899',
-                        backgroundColor: 'rgba(236, 72, 153, 0.1)',
-                        fill: true,
-                        tension: 0.4
-                    },
-                    {
-                        label: 'Yearly Average',
-                        data: new Array(data.length).fill(monthlyAvgs.avg_wait_time),
-                        borderColor: '#60a5fa',
-                        borderDash: [5, 5],
-                        fill: false
-                    }
-                ]
-            }, 'Wait Time (minutes)');
-        }
-
-        // Create line chart helper with enhanced tooltip support
-        function createLineChart(canvasId, data, yAxisLabel, tooltipOptions = {}) {
-            const ctx = document.getElementById(canvasId).getContext('2d');
-            
-            // Destroy existing chart if it exists
-            if (charts[canvasId]) {
-                charts[canvasId].destroy();
-            }
-            
-            // Chart.js defaults for dark theme
-            Chart.defaults.color = '#9ca3af';
-            Chart.defaults.borderColor = '#374151';
-            
-            charts[canvasId] = new Chart(ctx, {
-                type: 'line',
-                data: data,
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {
-                        legend: {
-                            position: 'top',
-                            labels: {
-                                color: '#9ca3af',
-                                usePointStyle: true,
-                                padding: 20
-                            }
-                        },
-                        tooltip: {
-                            mode: 'index',
-                            intersect: false,
-                            backgroundColor: '#1f2937',
-                            titleColor: '#ffffff',
-                            bodyColor: '#9ca3af',
-                            borderColor: '#374151',
-                            borderWidth: 1,
-                            callbacks: tooltipOptions.tooltipCallback ? {
-                                afterBody: tooltipOptions.tooltipCallback
-                            } : {}
-                        }
-                    },
-                    scales: {
-                        x: {
-                            title: {
-                                display: true,
-                                text: 'Time Period',
-                                color: '#9ca3af'
-                            },
-                            ticks: {
-                                color: '#9ca3af'
-                            },
-                            grid: {
-                                color: '#374151'
-                            }
-                        },
-                        y: {
-                            title: {
-                                display: true,
-                                text: yAxisLabel,
-                                color: '#9ca3af'
-                            },
-                            beginAtZero: true,
-                            ticks: {
-                                color: '#9ca3af'
-                            },
-                            grid: {
-                                color: '#374151'
-                            }
-                        }
-                    },
-                    interaction: {
-                        mode: 'nearest',
-                        axis: 'x',
-                        intersect: false
-                    }
-                }
-            });
-        }
-
-        // Show message helper
-        function showMessage(message, type) {
-            const errorEl = document.getElementById('errorMsg');
-            const successEl = document.getElementById('successMsg');
-            const infoEl = document.getElementById('infoMsg');
-            
-            errorEl.style.display = 'none';
-            successEl.style.display = 'none';
-            infoEl.style.display = 'none';
-            
-            if (type === 'error') {
-                errorEl.textContent = message;
-                errorEl.style.display = 'block';
-                setTimeout(() => errorEl.style.display = 'none', 8000);
-            } else if (type === 'info') {
-                infoEl.textContent = message;
-                infoEl.style.display = 'block';
-                setTimeout(() => infoEl.style.display = 'none', 4000);
-            } else {
-                successEl.textContent = message;
-                successEl.style.display = 'block';
-                setTimeout(() => successEl.style.display = 'none', 5000);
-            }
-        }
-
-        // Initialize when page loads
-        document.addEventListener('DOMContentLoaded', initApp);
-    </script>
-</body>
-</html>
-'''
+# The page script is referenced by a content hash, so it can be cached indefinitely
+with open(os.path.join(app.static_folder, 'app.js'), 'rb') as f:
+    APP_JS_VERSION = hashlib.sha1(f.read()).hexdigest()[:12]
+DASHBOARD_HTML = DASHBOARD_HTML.replace('src="/static/app.js"', f'src="/static/app.js?v={APP_JS_VERSION}"')
+
+DASHBOARD_BYTES = DASHBOARD_HTML.encode('utf-8')
+DASHBOARD_ENCODED = {
+    None: DASHBOARD_BYTES,
+    'br': brotli.compress(DASHBOARD_BYTES),
+    'gzip': gzip.compress(DASHBOARD_BYTES, 6),
+}
+DASHBOARD_ETAG = hashlib.sha1(DASHBOARD_BYTES).hexdigest()
 
 if __name__ == '__main__':
     print("NYC Taxi Analytics Dashboard with Total Fare Tracking and High Impact Routes")
@@ -2734,6 +1122,7 @@ if __name__ == '__main__':
     
     if init_database():
         print("Database initialized successfully!")
+        threading.Thread(target=warm_high_impact_cache, daemon=True).start()
         print("Starting Flask server...")
         print("Open your browser to: http://localhost:8000")
         print("=" * 70)
@@ -2,4 +2,14 @@
 set -euo pipefail
 export PYTHONUNBUFFERED=1
 export PORT="${PORT:-8000}"
-python backend3.py
+
+# Build (or reuse) the database once, before any web workers start
+python -c "import sys, backend3; sys.exit(0 if backend3.init_database() else 1)"
+
+# Threaded workers overlap concurrent SQLite reads; each thread keeps its own connection
+exec gunicorn backend3:app \
+    --bind "0.0.0.0:${PORT}" \
+    --worker-class gthread \
+    --workers "${WEB_CONCURRENCY:-2}" \
+    --threads "${GUNICORN_THREADS:-8}" \
+    --timeout 120
@@ -0,0 +1,8 @@
+# Loaded automatically by gunicorn from the working directory
+import threading
+
+
+def post_worker_init(worker):
+    """Warm each worker's high impact cache in the background so it is ready before the first clicks"""
+    from backend3 import warm_high_impact_cache
+    threading.Thread(target=warm_high_impact_cache, daemon=True).start()
@@ -0,0 +1,1501 @@
+// Global variables
+let map;
+let zonesLayer;
+let zoneRenderer;
+// Fraction of the viewport kept drawn beyond each edge, by the canvas and by zone culling
+const ZONE_VIEW_PADDING = 0.2;
+let zoneFeatures = [];              // every loaded zone with its precomputed bounds
+let visibleZoneLayers = new Map();  // feature -> layer currently on the map
+let hoveredZone = null;             // zone currently drawn highlighted
+let pendingHoverZone = null;        // zone under the cursor, highlighted on the next frame
+let hoverFrame = null;
+let pickupZoneId = null;
+let dropoffZoneId = null;
+let charts = {};
+const tabElements = new Map();  // tab name -> { header, content }, filled by setupEventListeners
+const summaryStatElements = {};  // summary stat id -> element, filled by setupEventListeners
+
+// In-flight request of each analysis; a new click aborts the one it supersedes
+let routeAnalysisController = null;
+let dayHourController = null;
+let monthController = null;
+
+// Chart.js is only needed once a route is analyzed, so it is imported on first use
+const CHART_JS_URL = 'https://cdn.jsdelivr.net/npm/chart.js/auto/+esm';
+let Chart;
+let chartJsLoading = null;
+
+function loadChartJs() {
+    if (!chartJsLoading) {
+        chartJsLoading = import(CHART_JS_URL)
+            .then(module => {
+                Chart = module.default;
+                initChartDefaults();
+            })
+            .catch(error => {
+                chartJsLoading = null;  // let the next analysis retry
+                throw error;
+            });
+    }
+    return chartJsLoading;
+}
+
+// Chart.js defaults for dark theme, set once when Chart.js is loaded
+function initChartDefaults() {
+    Chart.defaults.color = '#9ca3af';
+    Chart.defaults.borderColor = '#374151';
+}
+
+// Resolve when the browser is idle, or after timeout ms at the latest
+// (Safari has no requestIdleCallback, so it just yields to the event loop)
+function whenIdle(timeout) {
+    return new Promise(resolve => {
+        if ('requestIdleCallback' in window) {
+            requestIdleCallback(() => resolve(), { timeout });
+        } else {
+            setTimeout(resolve, 0);
+        }
+    });
+}
+
+// Initialize the application
+async function initApp() {
+    for (const type in MESSAGE_TYPES) {
+        messageElements[type] = document.getElementById(MESSAGE_TYPES[type].id);
+    }
+    try {
+        showMessage('Initializing dashboard...', 'info');
+        initMap();
+        setupEventListeners();
+        await checkHealth();
+        // Let the browser paint the controls before the zone download and map work start
+        await whenIdle(500);
+        await loadTaxiZones();
+        showMessage('Dashboard ready! Upload a shapefile or select zones on the map.', 'success');
+    } catch (error) {
+        console.error('Initialization error:', error);
+        showMessage('Error initializing dashboard: ' + error.message, 'error');
+    }
+}
+
+// Initialize map
+function initMap() {
+    // No per-tile fade or marker zoom animations; each costs a composited layer per element
+    map = L.map('map', {
+        preferCanvas: true,
+        fadeAnimation: false,
+        markerZoomAnimation: false
+    }).setView([40.7589, -73.9851], 11);
+    
+    // Dark tile layer
+    L.tileLayer('https://{s}.basemaps.cartocdn.com/dark_all/{z}/{x}/{y}{r}.png', {
+        attribution: '© OpenStreetMap contributors, © CARTO',
+        keepBuffer: 4,  // rows of off-screen tiles kept loaded, so pans reuse them
+        // Request tiles once a zoom or pan settles rather than for every intermediate frame
+        updateWhenZooming: false,
+        updateWhenIdle: true
+    }).addTo(map);
+
+    // Zones are painted on a single canvas rather than as one SVG path per zone
+    zoneRenderer = L.canvas({ padding: ZONE_VIEW_PADDING });
+
+    // moveend also fires after every zoom
+    map.on('moveend', refreshVisibleZones);
+}
+
+// Load taxi zones from API
+// Zones rarely change, so a copy kept in Cache Storage is drawn immediately and
+// revalidated in the background (an ETag match costs the server a bare 304)
+const ZONES_URL = '/api/taxi-zones';
+const ZONES_CACHE = 'taxi-zones-v1';
+
+async function loadTaxiZones(preferCache = true) {
+    try {
+        // Cache Storage only exists in secure contexts (https or localhost)
+        const cache = ('caches' in window) ? await caches.open(ZONES_CACHE) : null;
+        const cached = cache && preferCache ? await cache.match(ZONES_URL) : null;
+        const network = fetch(ZONES_URL, { cache: 'no-cache' });
+
+        if (cached) {
+            await showZones(cached);
+            network.then(async response => {
+                const etag = response.headers.get('ETag');
+                if (!response.ok || (etag && etag === cached.headers.get('ETag'))) return;
+                await cache.put(ZONES_URL, response.clone());
+                await showZones(response);
+            }).catch(error => console.error('Error refreshing taxi zones:', error));
+            return;
+        }
+
+        const response = await network;
+        if (cache && response.ok) {
+            await cache.put(ZONES_URL, response.clone());
+        }
+        await showZones(response);
+    } catch (error) {
+        console.error('Error loading taxi zones:', error);
+        showMessage('Error loading zones: ' + error.message, 'error');
+    }
+}
+
+// Draw the zones in a response, or prompt for a shapefile if there are none
+async function showZones(response) {
+    const count = await streamZones(response);
+    if (count > 0) {
+        showMessage(`Loaded ${count} taxi zones`, 'success');
+    } else {
+        showMessage('No zones loaded. Please upload a shapefile.', 'info');
+    }
+}
+
+// Draw zones while the GeoJSON is still downloading. Saved zone files hold one feature per
+// line between a header line ending in '[' and a closing ']}' line (see process_shapefile);
+// any other layout is parsed whole once downloaded
+async function streamZones(response) {
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    let lineLayout = null;  // unknown until the first line arrives
+    let count = 0;
+
+    // The current zones are only replaced once the response actually holds some
+    const add = feature => {
+        if (count++ === 0) clearZones();
+        addZone(feature);
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+
+        if (lineLayout === null) {
+            const newline = buffer.indexOf('\n');
+            if (newline < 0) continue;
+            lineLayout = buffer.slice(0, newline).trimEnd().endsWith('[');
+            if (lineLayout) buffer = buffer.slice(newline + 1);
+        }
+        if (!lineLayout) continue;
+
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).replace(/,\s*$/, '');
+            buffer = buffer.slice(newline + 1);
+            if (line.startsWith('{')) add(JSON.parse(line));
+        }
+    }
+
+    if (!lineLayout) {
+        (JSON.parse(buffer).features || []).forEach(add);
+    }
+    if (count > 0) fitZones();
+    return count;
+}
+
+// Bounding box of a GeoJSON feature; uploaded zones carry a precomputed [minLon, minLat, maxLon, maxLat]
+// bbox, others fall back to walking the geometry's coordinates
+function featureBounds(feature) {
+    if (feature.bbox) {
+        const [minLon, minLat, maxLon, maxLat] = feature.bbox;
+        return L.latLngBounds([minLat, minLon], [maxLat, maxLon]);
+    }
+
+    const bounds = L.latLngBounds([]);
+    (function extend(coords) {
+        if (typeof coords[0] === 'number') {
+            bounds.extend([coords[1], coords[0]]);
+        } else {
+            coords.forEach(extend);
+        }
+    })(feature.geometry.coordinates);
+    return bounds;
+}
+
+// Resolve the zone ID and display name once per feature as _id and _name, so hover and
+// click handlers read a single property (shapefiles use different field names)
+function normalizeZoneProperties(properties) {
+    properties._id = properties.LocationID || 
+                     properties.OBJECTID || 
+                     properties.zone_id || 
+                     properties.id ||
+                     properties.Zone;
+    
+    properties._name = properties.zone || 
+                       properties.Zone || 
+                       properties.borough || 
+                       properties.name ||
+                       `Zone ${properties._id}`;
+}
+
+// Display zones on map
+function displayZones(geojsonData) {
+    clearZones();
+    geojsonData.features.forEach(addZone);
+    fitZones();
+}
+
+// Replace the zone layer with an empty one, ready for addZone
+function clearZones() {
+    if (zonesLayer) {
+        map.removeLayer(zonesLayer);
+    }
+
+    zoneFeatures = [];
+    visibleZoneLayers = new Map();
+
+    zonesLayer = L.geoJSON(null, {
+        renderer: zoneRenderer,
+        style: {
+            fillColor: '#ffffff',
+            weight: 1,
+            opacity: 0.8,
+            color: '#ffffff',
+            fillOpacity: 0.1
+        },
+        pointToLayer: function(feature, latlng) {
+            return L.circleMarker(latlng, {
+                renderer: zoneRenderer,
+                radius: 8,
+                fillColor: '#ffffff',
+                color: '#ffffff',
+                weight: 2,
+                opacity: 0.8,
+                fillOpacity: 0.3
+            });
+        },
+        onEachFeature: function(feature, layer) {
+            visibleZoneLayers.set(feature, layer);
+        }
+    }).addTo(map);
+
+    // One tooltip and one set of handlers on the layer group serve every zone; e.layer is the zone under the cursor
+    zonesLayer.bindTooltip(layer => {
+        const { _id, _name } = layer.feature.properties;
+        return `<b>Zone ${_id}</b><br>${_name}`;
+    }, { sticky: true });
+
+    hoveredZone = pendingHoverZone = null;
+    zonesLayer.on('mouseover', e => scheduleZoneHover(e.layer));
+    zonesLayer.on('mouseout', e => {
+        if (pendingHoverZone === e.layer) scheduleZoneHover(null);
+    });
+
+    zonesLayer.on('click', function(e) {
+        const { _id, _name } = e.layer.feature.properties;
+        if (_id) {
+            selectZone(parseInt(_id), _name);
+        }
+    });
+
+}
+
+// Register one zone; only zones near the viewport get layers (see refreshVisibleZones)
+function addZone(feature) {
+    if (!feature.geometry) return;
+
+    normalizeZoneProperties(feature.properties);
+    const bounds = featureBounds(feature);
+    zoneFeatures.push({ feature, bounds });
+    if (map.getBounds().pad(ZONE_VIEW_PADDING).intersects(bounds)) {
+        zonesLayer.addData(feature);
+    }
+}
+
+// Fit map to zones
+function fitZones() {
+    if (zoneFeatures.length === 0) return;
+
+    const allBounds = L.latLngBounds([]);
+    zoneFeatures.forEach(zone => allBounds.extend(zone.bounds));
+    map.fitBounds(allBounds);
+    refreshVisibleZones();
+}
+
+// Highlight the zone under the cursor at most once per frame; fast sweeps over the map
+// fire many mouseover/mouseout pairs that would otherwise each restyle a zone
+function scheduleZoneHover(layer) {
+    pendingHoverZone = layer;
+    if (hoverFrame) return;
+    hoverFrame = requestAnimationFrame(() => {
+        hoverFrame = null;
+        if (pendingHoverZone === hoveredZone) return;
+        if (hoveredZone) {
+            hoveredZone.setStyle({ weight: 1, fillOpacity: 0.1 });
+        }
+        if (pendingHoverZone) {
+            pendingHoverZone.setStyle({ weight: 2, fillOpacity: 0.3 });
+        }
+        hoveredZone = pendingHoverZone;
+    });
+}
+
+// Add zones entering the padded viewport and remove those that left it
+function refreshVisibleZones() {
+    if (!zonesLayer) return;
+
+    // The padding keeps zones just off screen drawn, so small pans don't flash
+    const viewBounds = map.getBounds().pad(ZONE_VIEW_PADDING);
+    zoneFeatures.forEach(({ feature, bounds }) => {
+        const layer = visibleZoneLayers.get(feature);
+        if (viewBounds.intersects(bounds)) {
+            if (!layer) zonesLayer.addData(feature);
+        } else if (layer) {
+            zonesLayer.removeLayer(layer);
+            visibleZoneLayers.delete(feature);
+        }
+    });
+}
+
+// Upload shapefile
+async function uploadShapefile(file) {
+    const formData = new FormData();
+    formData.append('shapefile', file);
+
+    try {
+        showMessage('Uploading and processing shapefile...', 'info');
+        
+        const response = await fetch('/upload-zones', {
+            method: 'POST',
+            body: formData
+        });
+
+        const result = await response.json();
+        
+        if (response.ok) {
+            showMessage(`Shapefile processed successfully! Loaded ${result.zones_count} zones.`, 'success');
+            clearHighImpactCache();
+            // Skip the cached copy, it still holds the previous zones
+            await loadTaxiZones(false);
+        } else {
+            throw new Error(result.error);
+        }
+    } catch (error) {
+        showMessage('Upload failed: ' + error.message, 'error');
+    }
+}
+
+// Setup event listeners
+function setupEventListeners() {
+    document.getElementById('analyzeBtn').addEventListener('click', analyzeRoute);
+    document.getElementById('analyzeDayHourBtn').addEventListener('click', analyzeHighImpactByDayHour);
+    document.getElementById('analyzeMonthBtn').addEventListener('click', analyzeHighImpactByMonth);
+    
+    // File upload
+    document.getElementById('shapefileInput').addEventListener('change', function(e) {
+        const file = e.target.files[0];
+        if (file) {
+            document.getElementById('uploadStatus').textContent = `Selected: ${file.name}`;
+            uploadShapefile(file);
+        }
+    });
+    
+    ['totalTrips', 'avgDuration', 'avgPriceMile', 'avgTotalFare', 'avgWaitTime'].forEach(id => {
+        summaryStatElements[id] = document.getElementById(id);
+    });
+
+    // Tab switching: one listener on the header bar serves every tab
+    document.querySelectorAll('.tab-header').forEach(header => {
+        tabElements.set(header.dataset.tab, { header, content: document.getElementById(header.dataset.tab) });
+    });
+    document.querySelector('.tab-headers').addEventListener('click', e => {
+        const tab = e.target.closest('.tab-header');
+        if (tab) switchTab(tab.dataset.tab);
+    });
+
+    // Charts are built only once their canvas is on screen
+    observeChartCanvases();
+}
+
+// Select zone function
+function selectZone(zoneId, zoneName) {
+    if (!pickupZoneId) {
+        pickupZoneId = zoneId;
+        document.getElementById('pickupZone').textContent = `${zoneId}: ${zoneName}`;
+        showMessage(`Pickup zone selected: ${zoneName}`, 'success');
+    } else if (!dropoffZoneId) {
+        // allow same zone for dropoff
+        dropoffZoneId = zoneId;
+        document.getElementById('dropoffZone').textContent = `${zoneId}: ${zoneName}`;
+        document.getElementById('analyzeBtn').disabled = false;
+        const same = (pickupZoneId === dropoffZoneId) ? ' (same as pickup)' : '';
+        showMessage(`Dropoff zone selected: ${zoneName}${same}. Click "Analyze Route" to process data.`, 'success');
+    } else if (zoneId === pickupZoneId && zoneId === dropoffZoneId) {
+    // both already same—nudge user to analyze or reselect
+    showMessage('Pickup and dropoff are the same. Click Analyze Route or pick new zones.', 'info');
+    } else {
+        // Reset and start over
+        pickupZoneId = zoneId;
+        dropoffZoneId = null;
+        document.getElementById('pickupZone').textContent = `${zoneId}: ${zoneName}`;
+        document.getElementById('dropoffZone').textContent = 'Select on map';
+        document.getElementById('analyzeBtn').disabled = true;
+        clearSummaryStats();
+        showMessage(`New pickup zone selected: ${zoneName}. Select a dropoff zone.`, 'success');
+    }
+}
+
+// Switch tabs
+function switchTab(tabName) {
+    // toggle() with a force flag leaves tabs whose state doesn't change untouched
+    for (const [name, { header, content }] of tabElements) {
+        header.classList.toggle('active', name === tabName);
+        content.classList.toggle('active', name === tabName);
+    }
+}
+
+// Check backend health and update UI accordingly
+async function checkHealth() {
+    try {
+        const response = await fetch('/api/health');
+        const health = await response.json();
+        if (health.status === 'healthy') {
+            showMessage(`Connected to database with ${health.total_records.toLocaleString()} records`, 'success');
+            
+            // Hide upload section if geopandas is not available
+            if (!health.geopandas_available) {
+                document.querySelector('.upload-section').style.display = 'none';
+                showMessage('Shapefile upload disabled - using default zones. To enable upload, install: pip install geopandas', 'info');
+                // Load some default zones for demo, once the shell has painted
+                whenIdle(1000).then(loadDefaultZones);
+            }
+        } else {
+            throw new Error('Backend not ready');
+        }
+    } catch (error) {
+        showMessage('Backend connection failed: ' + error.message, 'error');
+        throw error;
+    }
+}
+
+// Load default zones if geopandas is not available
+function loadDefaultZones() {
+    const defaultZones = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {
+                    "LocationID": 1,
+                    "zone": "Newark Airport"
+                },
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [-74.1745, 40.6895]
+                }
+            },
+            {
+                "type": "Feature", 
+                "properties": {
+                    "LocationID": 48,
+                    "zone": "Clinton East"
+                },
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [-73.9924, 40.7614]
+                }
+            },
+            {
+                "type": "Feature",
+                "properties": {
+                    "LocationID": 127,
+                    "zone": "JFK Airport"
+                },
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [-73.7781, 40.6413]
+                }
+            },
+            {
+                "type": "Feature",
+                "properties": {
+                    "LocationID": 133,
+                    "zone": "LaGuardia Airport"
+                },
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [-73.8740, 40.7769]
+                }
+            },
+            {
+                "type": "Feature",
+                "properties": {
+                    "LocationID": 230,
+                    "zone": "Upper East Side South"
+                },
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [-73.9565, 40.7690]
+                }
+            },
+            {
+                "type": "Feature",
+                "properties": {
+                    "LocationID": 261,
+                    "zone": "World Trade Center"
+                },
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [-74.0125, 40.7116]
+                }
+            }
+        ]
+    };
+    
+    displayZones(defaultZones);
+    showMessage('Loaded default zones for demo. Upload shapefile for full zone coverage.', 'info');
+}
+
+// Analyze route with REAL data
+async function analyzeRoute() {
+    if (!pickupZoneId || !dropoffZoneId) {
+        showMessage('Please select both pickup and dropoff zones', 'error');
+        return;
+    }
+
+    routeAnalysisController?.abort();
+    const controller = routeAnalysisController = new AbortController();
+
+    document.getElementById('loadingIndicator').classList.add('show');
+    document.getElementById('chartsTabs').style.display = 'none';
+
+    try {
+        const dayType = document.getElementById('dayType').value;
+        
+        showMessage('Querying database...', 'info');
+        
+        // The loading indicator stays up until both the data and Chart.js have arrived
+        const [response] = await Promise.all([
+            fetch(`/api/route-analysis?pickup=${pickupZoneId}&dropoff=${dropoffZoneId}&day_type=${dayType}`,
+                  { signal: controller.signal }),
+            loadChartJs()
+        ]);
+        
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || 'Failed to analyze route');
+        }
+        
+        const routeData = await response.json();
+        
+        // Update summary statistics
+        updateSummaryStats(routeData.summary);
+        
+        // Create charts with REAL data
+        createHourlyCharts(routeData.hourly);
+        createDailyCharts(routeData.daily);
+        createMonthlyCharts(routeData.monthly);
+        
+        document.getElementById('loadingIndicator').classList.remove('show');
+        document.getElementById('chartsTabs').style.display = 'block';
+        
+        showMessage(`Analysis complete! Processed ${routeData.summary.total_trips.toLocaleString()} trips.`, 'success');
+        
+    } catch (error) {
+        if (error.name === 'AbortError') return;  // superseded by a newer analysis
+        console.error('Analysis error:', error);
+        document.getElementById('loadingIndicator').classList.remove('show');
+        
+        if (error.message.includes('No trips found')) {
+            showMessage(`${error.message}. Try selecting different zones or changing the day type filter.`, 'error');
+        } else {
+            showMessage('Error processing data: ' + error.message, 'error');
+        }
+    }
+}
+
+// NEW HIGH IMPACT ROUTES FUNCTIONS
+// Results only change when the data or zones change, so each selection is fetched once and
+// kept in memory and in sessionStorage (keyed by URL) for the rest of the browser session
+const HIGH_IMPACT_KEY_PREFIX = 'highImpact:';
+const highImpactCache = new Map();
+
+function cachedHighImpact(url) {
+    if (highImpactCache.has(url)) return highImpactCache.get(url);
+    try {
+        const stored = JSON.parse(sessionStorage.getItem(HIGH_IMPACT_KEY_PREFIX + url));
+        if (stored) highImpactCache.set(url, stored);
+        return stored;
+    } catch (error) {
+        return null;  // storage unavailable or entry unreadable
+    }
+}
+
+async function fetchHighImpact(url, signal) {
+    const resp = await fetch(url, { signal });
+    const data = await resp.json();
+    if (!resp.ok) throw new Error(data.error || 'Failed to load routes');
+
+    highImpactCache.set(url, data);
+    try {
+        sessionStorage.setItem(HIGH_IMPACT_KEY_PREFIX + url, JSON.stringify(data));
+    } catch (error) {
+        // Storage full or disabled; the in-memory copy still serves this page
+    }
+    return data;
+}
+
+// Cached results embed zone names, so they are dropped when new zones are uploaded
+function clearHighImpactCache() {
+    highImpactCache.clear();
+    try {
+        Object.keys(sessionStorage)
+            .filter(key => key.startsWith(HIGH_IMPACT_KEY_PREFIX))
+            .forEach(key => sessionStorage.removeItem(key));
+    } catch (error) {
+        // Storage unavailable; nothing was persisted
+    }
+}
+
+async function analyzeHighImpactByDayHour() {
+    const day = document.getElementById('dayHourDaySelect').value;
+    const hour = document.getElementById('dayHourHourSelect').value;
+
+    if ((day === '' || day === null) || (hour === '' || hour === null)) {
+        showMessage('Please select both a day and an hour', 'error');
+        return;
+    }
+
+    const header = document.getElementById('highImpactCombinedHeader');
+    const volDiv = document.getElementById('highImpactCombinedVolume');
+    const priceDiv = document.getElementById('highImpactCombinedPrice');
+
+    dayHourController?.abort();
+    const controller = dayHourController = new AbortController();
+
+    const url = `/api/high-impact-routes?day=${day}&hour=${hour}`;
+    const cached = cachedHighImpact(url);
+    if (!cached) {
+        const loadingHTML = '<div class="loading show"><div class="spinner"></div><p>Loading top routes...</p></div>';
+        volDiv.innerHTML = loadingHTML;
+        priceDiv.innerHTML = loadingHTML;
+        header.textContent = '';
+    }
+
+    try {
+        const data = cached || await fetchHighImpact(url, controller.signal);
+
+        header.textContent = `Top routes for ${data.day_name} at ${String(data.hour).padStart(2,'0')}:00`;
+
+        // Table 1: Top by Volume
+        volDiv.innerHTML = renderHighImpactTable(
+            data.top_by_volume,
+            'Top 10 Routes by Volume',
+            true, // show volume emphasis
+            data.zones
+        );
+
+        // Table 2: Top by Price (Avg Fare)
+        priceDiv.innerHTML = renderHighImpactTable(
+            data.top_by_price,
+            'Top 10 Routes by Price (Avg Fare)',
+            false, // show price emphasis
+            data.zones
+        );
+
+        showMessage(`Loaded ${data.top_by_volume.length} by volume and ${data.top_by_price.length} by price.`, 'success');
+    } catch (e) {
+        if (e.name === 'AbortError') return;  // superseded by a newer selection
+        volDiv.innerHTML = `<div class="no-data">${e.message}</div>`;
+        priceDiv.innerHTML = `<div class="no-data">${e.message}</div>`;
+        showMessage('Error loading high impact routes: ' + e.message, 'error');
+    }
+}
+
+// Shared formatter for whole-number table cells; toLocaleString would build one per call
+const INTEGER_FORMAT = new Intl.NumberFormat(undefined, { maximumFractionDigits: 0 });
+// Shared formatter for fare amounts in chart tooltips
+const FARE_FORMAT = new Intl.NumberFormat('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+
+// Reuse your existing table style; render two different emphases.
+function renderHighImpactTable(routes, title, emphasizeVolume, zones) {
+    if (!routes || routes.length === 0) {
+        return '<div class="no-data">No routes found for the selected day & hour.</div>';
+    }
+
+    let html = `
+        <div style="margin-bottom: 12px;">
+            <h3 style="color:#ffffff; margin-bottom:6px;">${title}</h3>
+            <p style="color:#9ca3af; font-size:0.875rem;">Ranked ${emphasizeVolume ? 'by trip volume' : 'by average fare'}</p>
+        </div>
+        <table class="routes-table">
+            <thead>
+                <tr>
+                    <th>Rank</th>
+                    <th style="min-width:250px;">Route</th>
+                    <th>Volume</th>
+                    <th>Total Revenue</th>
+                    <th>Avg Fare</th>
+                    <th>Avg Duration</th>
+                    <th>Avg Distance</th>
+                </tr>
+            </thead>
+            <tbody>
+    `;
+
+    const rows = routes.map((r, i) => `
+            <tr>
+                <td class="route-rank">#${i + 1}</td>
+                <td class="route-name" style="max-width:300px; word-wrap:break-word;">${zones[r.pickup_zone]} → ${zones[r.dropoff_zone]}</td>
+                <td class="volume-cell">${INTEGER_FORMAT.format(r.volume || 0)}</td>
+                <td class="revenue-cell">${INTEGER_FORMAT.format(r.total_revenue || 0)}</td>
+                <td>${(r.avg_total_fare || 0).toFixed(2)}</td>
+                <td>${(r.avg_duration || 0).toFixed(1)} min</td>
+                <td>${(r.avg_distance || 0).toFixed(1)} mi</td>
+            </tr>
+        `);
+
+    html += rows.join('') + `</tbody></table>`;
+    return html;
+}
+
+async function analyzeHighImpactByMonth() {
+    const month = document.getElementById('monthSelect').value;
+    if (!month) {
+        showMessage('Please select a month', 'error');
+        return;
+    }
+
+    const header = document.getElementById('highImpactMonthHeader');
+    const volDiv = document.getElementById('highImpactMonthVolume');
+    const priceDiv = document.getElementById('highImpactMonthPrice');
+
+    monthController?.abort();
+    const controller = monthController = new AbortController();
+
+    const url = `/api/high-impact-routes-by-month?month=${month}`;
+    const cached = cachedHighImpact(url);
+    if (!cached) {
+        const loadingHTML = '<div class="loading show"><div class="spinner"></div><p>Loading top routes...</p></div>';
+        header.textContent = '';
+        volDiv.innerHTML = loadingHTML;
+        priceDiv.innerHTML = loadingHTML;
+    }
+
+    try {
+        const data = cached || await fetchHighImpact(url, controller.signal);
+
+        header.textContent = `Top routes for ${data.month_name}`;
+
+        // Table 1: Top by Volume
+        volDiv.innerHTML = renderHighImpactTable(
+        data.top_by_volume || [],
+        'Top 10 Routes by Volume (Month)',
+        true, // emphasize volume
+        data.zones
+        );
+
+        // Table 2: Top by Total Price (Revenue)
+        priceDiv.innerHTML = renderHighImpactTable(
+        data.top_by_price || [],
+        'Top 10 Routes by Total Price (Revenue) (Month)',
+        false, // emphasize price
+        data.zones
+        );
+
+        showMessage(`Loaded ${ (data.top_by_volume||[]).length } by volume and ${ (data.top_by_price||[]).length } by price.`, 'success');
+    } catch (error) {
+        if (error.name === 'AbortError') return;  // superseded by a newer selection
+        volDiv.innerHTML = `<div class="no-data">${error.message}</div>`;
+        priceDiv.innerHTML = `<div class="no-data">${error.message}</div>`;
+        showMessage('Error loading high impact routes: ' + error.message, 'error');
+    }
+}
+
+
+// Update summary statistics INCLUDING total fare
+function updateSummaryStats(summary) {
+    const stats = summaryStatElements;
+    stats.totalTrips.textContent = INTEGER_FORMAT.format(summary.total_trips);
+    stats.avgDuration.textContent = summary.avg_duration.toFixed(1) + ' min';
+    stats.avgPriceMile.textContent = '$' + summary.avg_price_mile.toFixed(2);
+    stats.avgTotalFare.textContent = '$' + summary.avg_total_fare.toFixed(2);
+    stats.avgWaitTime.textContent = summary.avg_wait_time.toFixed(1) + ' min';
+}
+
+// Clear summary statistics
+function clearSummaryStats() {
+    for (const element of Object.values(summaryStatElements)) {
+        element.textContent = '—';
+    }
+}
+
+// x-axis labels for the hourly charts
+const HOUR_LABELS = Array.from({ length: 24 }, (_, hour) => `${hour}:00`);
+
+// Canvas ids of the charts on each series tab
+const HOURLY_CHART_IDS = ['hourlyVolumeChart', 'hourlyPriceChart', 'hourlyTotalFareChart', 'hourlyDurationChart', 'hourlyWaitChart'];
+const DAILY_CHART_IDS = ['dailyVolumeChart', 'dailyPriceChart', 'dailyTotalFareChart', 'dailyDurationChart', 'dailyWaitChart'];
+const MONTHLY_CHART_IDS = ['monthlyVolumeChart', 'monthlyPriceChart', 'monthlyTotalFareChart', 'monthlyDurationChart', 'monthlyWaitChart'];
+
+// Remove charts left from a previous analysis, built or still waiting to be built
+function clearCharts(canvasIds) {
+    for (const canvasId of canvasIds) {
+        pendingCharts.delete(canvasId);
+        if (charts[canvasId]) {
+            charts[canvasId].destroy();
+            delete charts[canvasId];
+        }
+    }
+}
+
+// Create hourly charts INCLUDING total fare chart
+function createHourlyCharts(data) {
+    // Nothing to plot: clear the tab instead of building charts of zeros
+    if (data.hour.length === 0) {
+        clearCharts(HOURLY_CHART_IDS);
+        return;
+    }
+
+    // One column per metric, indexed by hour; hours without trips stay 0
+    const volume = new Float64Array(24);
+    const pricePerMile = new Float64Array(24);
+    const totalFare = new Float64Array(24);
+    const duration = new Float64Array(24);
+    const waitTime = new Float64Array(24);
+
+    // Averages cover the hours that had trips, summed in the same pass
+    const sums = { volume: 0, price_per_mile: 0, total_fare_amount: 0, avg_duration: 0, avg_wait_time: 0 };
+    let hoursWithTrips = 0;
+    for (let i = 0; i < data.hour.length; i++) {
+        const h = data.hour[i];
+        volume[h] = data.volume[i];
+        pricePerMile[h] = data.price_per_mile[i];
+        totalFare[h] = data.total_fare_amount[i];
+        duration[h] = data.avg_duration[i];
+        waitTime[h] = data.avg_wait_time[i];
+        if (volume[h] > 0) {
+            sums.volume += volume[h];
+            sums.price_per_mile += pricePerMile[h];
+            sums.total_fare_amount += totalFare[h];
+            sums.avg_duration += duration[h];
+            sums.avg_wait_time += waitTime[h];
+            hoursWithTrips++;
+        }
+    }
+
+    const hourlyAvgs = {};
+    for (const key in sums) {
+        hourlyAvgs[key] = hoursWithTrips > 0 ? sums[key] / hoursWithTrips : 0;
+    }
+
+    createLineChart('hourlyVolumeChart', {
+        labels: HOUR_LABELS,
+        datasets: [
+            {
+                label: 'Trip Volume',
+                data: volume,
+                borderColor: '#ffffff',
+                backgroundColor: 'rgba(255, 255, 255, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Daily Average',
+                data: new Array(24).fill(hourlyAvgs.volume),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Trip Count');
+
+    createLineChart('hourlyPriceChart', {
+        labels: HOUR_LABELS,
+        datasets: [
+            {
+                label: 'Price per Mile',
+                data: pricePerMile,
+                borderColor: '#34d399',
+                backgroundColor: 'rgba(52, 211, 153, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Daily Average',
+                data: new Array(24).fill(hourlyAvgs.price_per_mile),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Price ($)');
+
+    // NEW: Total Fare Amount Chart for Hourly
+    // Formatted once; the tooltip callback runs on every hover
+    const yearlyAvg = FARE_FORMAT.format(hourlyAvgs.total_fare_amount);
+    createLineChart('hourlyTotalFareChart', {
+        labels: HOUR_LABELS,
+        datasets: [
+            {
+                label: 'Actual Total Price',
+                data: totalFare,
+                borderColor: '#06b6d4',
+                backgroundColor: 'rgba(6, 182, 212, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Yearly Average',
+                data: new Array(24).fill(hourlyAvgs.total_fare_amount),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Price ($)', {
+        tooltipCallback: function(items) {
+            const item = items[0];
+            return [
+                `Time: ${item.label}`,
+                `Total Price: $${FARE_FORMAT.format(item.parsed.y)}`,
+                `Yearly Average: $${yearlyAvg}`
+            ];
+        }
+    });
+
+    createLineChart('hourlyDurationChart', {
+        labels: HOUR_LABELS,
+        datasets: [
+            {
+                label: 'Duration',
+                data: duration,
+                borderColor: '#f59e0b',
+                backgroundColor: 'rgba(245, 158, 11, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Daily Average',
+                data: new Array(24).fill(hourlyAvgs.avg_duration),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Duration (minutes)');
+
+    createLineChart('hourlyWaitChart', {
+        labels: HOUR_LABELS,
+        datasets: [
+            {
+                label: 'Wait Time',
+                data: waitTime,
+                borderColor: '#ec4899',
+                backgroundColor: 'rgba(236, 72, 153, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Daily Average',
+                data: new Array(24).fill(hourlyAvgs.avg_wait_time),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Wait Time (minutes)');
+}
+
+// Wrap the label and metric columns of a chart series in typed arrays and add the mean of each metric
+function chartColumns(series, labelKey) {
+    const columns = {
+        labels: series[labelKey],
+        volume: Float64Array.from(series.volume),
+        price_per_mile: Float64Array.from(series.price_per_mile),
+        total_fare_amount: Float64Array.from(series.total_fare_amount),
+        avg_duration: Float64Array.from(series.avg_duration),
+        avg_wait_time: Float64Array.from(series.avg_wait_time)
+    };
+    const n = columns.labels.length;
+    let volume = 0, pricePerMile = 0, totalFare = 0, duration = 0, waitTime = 0;
+    for (let i = 0; i < n; i++) {
+        volume += columns.volume[i];
+        pricePerMile += columns.price_per_mile[i];
+        totalFare += columns.total_fare_amount[i];
+        duration += columns.avg_duration[i];
+        waitTime += columns.avg_wait_time[i];
+    }
+
+    const mean = sum => n > 0 ? sum / n : 0;
+    columns.averages = {
+        volume: mean(volume),
+        price_per_mile: mean(pricePerMile),
+        total_fare_amount: mean(totalFare),
+        avg_duration: mean(duration),
+        avg_wait_time: mean(waitTime)
+    };
+    return columns;
+}
+
+// Create daily charts INCLUDING total fare chart
+function createDailyCharts(data) {
+    if (data.day_of_week.length === 0) {
+        clearCharts(DAILY_CHART_IDS);
+        return;
+    }
+
+    const columns = chartColumns(data, 'day');
+    const labels = columns.labels;
+    const dailyAvgs = columns.averages;
+
+    createLineChart('dailyVolumeChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Trip Volume',
+                data: columns.volume,
+                borderColor: '#ffffff',
+                backgroundColor: 'rgba(255, 255, 255, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Weekly Average',
+                data: new Array(labels.length).fill(dailyAvgs.volume),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Trip Count');
+
+    createLineChart('dailyPriceChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Price per Mile',
+                data: columns.price_per_mile,
+                borderColor: '#34d399',
+                backgroundColor: 'rgba(52, 211, 153, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Weekly Average',
+                data: new Array(labels.length).fill(dailyAvgs.price_per_mile),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Price ($)');
+
+    // NEW: Total Fare Amount Chart for Daily
+    // Formatted once; the tooltip callback runs on every hover
+    const yearlyAvg = FARE_FORMAT.format(dailyAvgs.total_fare_amount);
+    createLineChart('dailyTotalFareChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Actual Total Price',
+                data: columns.total_fare_amount,
+                borderColor: '#06b6d4',
+                backgroundColor: 'rgba(6, 182, 212, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Yearly Average',
+                data: new Array(labels.length).fill(dailyAvgs.total_fare_amount),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Price ($)', {
+        tooltipCallback: function(items) {
+            const item = items[0];
+            return [
+                `Day: ${item.label}`,
+                `Total Price: $${FARE_FORMAT.format(item.parsed.y)}`,
+                `Yearly Average: $${yearlyAvg}`
+            ];
+        }
+    });
+
+    createLineChart('dailyDurationChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Duration',
+                data: columns.avg_duration,
+                borderColor: '#f59e0b',
+                backgroundColor: 'rgba(245, 158, 11, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Weekly Average',
+                data: new Array(labels.length).fill(dailyAvgs.avg_duration),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Duration (minutes)');
+
+    createLineChart('dailyWaitChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Wait Time',
+                data: columns.avg_wait_time,
+                borderColor: '#ec4899',
+                backgroundColor: 'rgba(236, 72, 153, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Weekly Average',
+                data: new Array(labels.length).fill(dailyAvgs.avg_wait_time),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Wait Time (minutes)');
+}
+
+// Create monthly charts INCLUDING total fare chart
+function createMonthlyCharts(data) {
+    if (data.month.length === 0) {
+        clearCharts(MONTHLY_CHART_IDS);
+        return;
+    }
+
+    const columns = chartColumns(data, 'month_name');
+    const labels = columns.labels;
+    const monthlyAvgs = columns.averages;
+
+    createLineChart('monthlyVolumeChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Trip Volume',
+                data: columns.volume,
+                borderColor: '#ffffff',
+                backgroundColor: 'rgba(255, 255, 255, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Yearly Average',
+                data: new Array(labels.length).fill(monthlyAvgs.volume),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Trip Count');
+
+    createLineChart('monthlyPriceChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Price per Mile',
+                data: columns.price_per_mile,
+                borderColor: '#34d399',
+                backgroundColor: 'rgba(52, 211, 153, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Yearly Average',
+                data: new Array(labels.length).fill(monthlyAvgs.price_per_mile),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Price ($)');
+
+    // NEW: Total Fare Amount Chart for Monthly
+    // Formatted once; the tooltip callback runs on every hover
+    const yearlyAvg = FARE_FORMAT.format(monthlyAvgs.total_fare_amount);
+    createLineChart('monthlyTotalFareChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Actual Total Price',
+                data: columns.total_fare_amount,
+                borderColor: '#06b6d4',
+                backgroundColor: 'rgba(6, 182, 212, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Yearly Average',
+                data: new Array(labels.length).fill(monthlyAvgs.total_fare_amount),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Price ($)', {
+        tooltipCallback: function(items) {
+            const item = items[0];
+            return [
+                `Month: ${item.label}`,
+                `Total Price: ${FARE_FORMAT.format(item.parsed.y)}`,
+                `Yearly Average: ${yearlyAvg}`
+            ];
+        }
+    });
+
+    createLineChart('monthlyDurationChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Duration',
+                data: columns.avg_duration,
+                borderColor: '#f59e0b',
+                backgroundColor: 'rgba(245, 158, 11, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Yearly Average',
+                data: new Array(labels.length).fill(monthlyAvgs.avg_duration),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Duration (minutes)');
+
+    createLineChart('monthlyWaitChart', {
+        labels,
+        datasets: [
+            {
+                label: 'Wait Time',
+                data: columns.avg_wait_time,
+                borderColor: '#ec4899',
+                backgroundColor: 'rgba(236, 72, 153, 0.1)',
+                fill: true,
+                tension: 0.4
+            },
+            {
+                label: 'Yearly Average',
+                data: new Array(labels.length).fill(monthlyAvgs.avg_wait_time),
+                borderColor: '#60a5fa',
+                borderDash: [5, 5],
+                fill: false
+            }
+        ]
+    }, 'Wait Time (minutes)');
+}
+
+// Create line chart helper with enhanced tooltip support
+// Charts waiting to be built, by canvas id, so a newer config replaces one not built yet.
+// Only charts whose canvas is on screen are built: the rest wait here until their tab is
+// opened or they are scrolled into view. Building starts on the next frame and constructs
+// one chart per task, so a refresh never holds the main thread for many charts at once
+const pendingCharts = new Map();
+const visibleCanvases = new Set();
+let chartBuildScheduled = false;
+
+// Track which chart canvases are on screen (or nearly) and build any chart waiting for one
+function observeChartCanvases() {
+    const observer = new IntersectionObserver(entries => {
+        for (const entry of entries) {
+            if (entry.isIntersecting) {
+                visibleCanvases.add(entry.target.id);
+            } else {
+                visibleCanvases.delete(entry.target.id);
+            }
+        }
+        scheduleChartBuild();
+    }, { rootMargin: '200px' });
+    document.querySelectorAll('canvas.chart-canvas').forEach(canvas => observer.observe(canvas));
+}
+
+function createLineChart(canvasId, data, yAxisLabel, tooltipOptions = {}) {
+    pendingCharts.set(canvasId, [data, yAxisLabel, tooltipOptions]);
+    scheduleChartBuild();
+}
+
+function scheduleChartBuild() {
+    if (!chartBuildScheduled && nextVisibleChart() !== null) {
+        chartBuildScheduled = true;
+        requestAnimationFrame(buildPendingCharts);
+    }
+}
+
+function nextVisibleChart() {
+    for (const canvasId of pendingCharts.keys()) {
+        if (visibleCanvases.has(canvasId)) return canvasId;
+    }
+    return null;
+}
+
+async function buildPendingCharts() {
+    try {
+        let canvasId;
+        while ((canvasId = nextVisibleChart()) !== null) {
+            const job = pendingCharts.get(canvasId);
+            pendingCharts.delete(canvasId);
+            buildLineChart(canvasId, ...job);
+            await yieldToMain();
+        }
+    } finally {
+        chartBuildScheduled = false;
+    }
+}
+
+// Let pending input and paint run before continuing
+function yieldToMain() {
+    if (window.scheduler && 'yield' in scheduler) return scheduler.yield();
+    return new Promise(resolve => setTimeout(resolve, 0));
+}
+
+// Options every route chart shares, built once. Chart.js copies options into its own config,
+// so these are never written to; only the y axis title and tooltip callback vary per chart
+const CHART_OPTIONS = {
+    responsive: true,
+    maintainAspectRatio: false,
+    // Cap the backing store resolution; on 2-3x displays this rasterizes a fraction of the
+    // pixels for lines that look nearly the same
+    devicePixelRatio: Math.min(window.devicePixelRatio || 1, 1.5),
+    // Draw each chart once, and redraw hover state immediately, instead of
+    // interpolating every frame of an animation
+    animation: false,
+    // Series are gap-free and indexed by their labels in order, so Chart.js can draw
+    // each line as one path and skip sorting and uniqueness checks on the data
+    spanGaps: true,
+    normalized: true,
+    transitions: {
+        active: {
+            animation: {
+                duration: 0
+            }
+        }
+    },
+    interaction: {
+        mode: 'nearest',
+        axis: 'x',
+        intersect: false
+    }
+};
+const CHART_LEGEND = {
+    position: 'top',
+    labels: {
+        color: '#9ca3af',
+        usePointStyle: true,
+        padding: 20
+    }
+};
+const CHART_TOOLTIP_STYLE = {
+    mode: 'index',
+    intersect: false,
+    backgroundColor: '#1f2937',
+    titleColor: '#ffffff',
+    bodyColor: '#9ca3af',
+    borderColor: '#374151',
+    borderWidth: 1
+};
+const CHART_AXIS_TICKS = {
+    color: '#9ca3af'
+};
+const CHART_AXIS_GRID = {
+    color: '#374151'
+};
+const CHART_X_SCALE = {
+    title: {
+        display: true,
+        text: 'Time Period',
+        color: '#9ca3af'
+    },
+    ticks: CHART_AXIS_TICKS,
+    grid: CHART_AXIS_GRID
+};
+
+function buildLineChart(canvasId, data, yAxisLabel, tooltipOptions = {}) {
+    // A chart already showing the same kind of series only needs its data swapped;
+    // scales, plugins and the canvas are reused
+    const chart = charts[canvasId];
+    if (chart && chart.options.scales.y.title.text === yAxisLabel &&
+            chart.data.datasets.length === data.datasets.length) {
+        chart.data.labels = data.labels;
+        data.datasets.forEach((dataset, i) => {
+            chart.data.datasets[i].data = dataset.data;
+        });
+        if (tooltipOptions.tooltipCallback) {
+            // The callback closes over this series' averages
+            chart.options.plugins.tooltip.callbacks.afterBody = tooltipOptions.tooltipCallback;
+        }
+        chart.update('none');
+        return;
+    }
+
+    const ctx = document.getElementById(canvasId).getContext('2d');
+    
+    // Destroy existing chart if it exists
+    if (chart) {
+        chart.destroy();
+    }
+    
+    charts[canvasId] = new Chart(ctx, {
+        type: 'line',
+        data: data,
+        options: {
+            ...CHART_OPTIONS,
+            plugins: {
+                legend: CHART_LEGEND,
+                // Only charts with a custom tooltip get their own tooltip options
+                tooltip: tooltipOptions.tooltipCallback ? {
+                    ...CHART_TOOLTIP_STYLE,
+                    callbacks: {
+                        afterBody: tooltipOptions.tooltipCallback
+                    }
+                } : CHART_TOOLTIP_STYLE
+            },
+            scales: {
+                x: CHART_X_SCALE,
+                y: {
+                    title: {
+                        display: true,
+                        text: yAxisLabel,
+                        color: '#9ca3af'
+                    },
+                    beginAtZero: true,
+                    ticks: CHART_AXIS_TICKS,
+                    grid: CHART_AXIS_GRID
+                }
+            }
+        }
+    });
+}
+
+// Show message helper
+// Banner element id and display time (ms) per message type
+const MESSAGE_TYPES = {
+    error: { id: 'errorMsg', duration: 8000 },
+    info: { id: 'infoMsg', duration: 4000 },
+    success: { id: 'successMsg', duration: 5000 }
+};
+const messageElements = {};  // message type -> banner element, filled by initApp
+let shownMessageEl = null;
+let messageTimer = null;     // hides shownMessageEl; only one is ever pending
+
+function showMessage(message, type) {
+    const kind = type in MESSAGE_TYPES ? type : 'success';
+    const el = messageElements[kind];
+
+    // Only one banner is up at a time; hide the previous one if it is a different banner
+    if (shownMessageEl && shownMessageEl !== el) {
+        shownMessageEl.style.display = 'none';
+    }
+    el.textContent = message;
+    el.style.display = 'block';
+    shownMessageEl = el;
+
+    // Any newer message replaces the pending hide, whatever its type
+    clearTimeout(messageTimer);
+    messageTimer = setTimeout(() => {
+        el.style.display = 'none';
+        shownMessageEl = null;
+        messageTimer = null;
+    }, MESSAGE_TYPES[kind].duration);
+}
+
+// Initialize when page loads
+document.addEventListener('DOMContentLoaded', initApp);